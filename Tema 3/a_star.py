@@ -1,5 +1,185 @@
-from graph import Node, Graph
+from heuristics import get_heuristic, estimates_to, heuristic_of_ids
+from search_stats import SearchStats
+from collections import namedtuple
+from collections.abc import Sequence
 from math import inf   
+import asyncio
+import heapq
+import time
+
+ExpansionEvent = namedtuple("ExpansionEvent", ["value", "distance_from_start", "heuristic_value", "open_size"])
+ExpansionEvent.__doc__ = """
+    One step of a search: the value of the extended node, its distance from the start node (g),
+    its heuristic value (f) and the number of nodes waiting in the opened list
+"""
+
+class NoPath:
+  """
+    This class used to represent the answer of a search when the target node can not be reached
+    from the start node. It is returned instead of the (path, cost) tuple and it is false in a
+    condition, so "if result:" tells both answers apart
+    ...
+    Attributes
+    ----------
+    start : str
+      The value of the start node
+    target : str
+      The value of the target node
+    reason : str
+      DIFFERENT_COMPONENTS when the graph knew the nodes are not connected before searching,
+      EXHAUSTED when the search ran out of opened nodes, NOT_FOUND when the start or the target
+      is not in the graph, BLOCKED when the start or the target cell of a grid is blocked, or
+      TIMED_OUT when the time budget of the search ran out before a path was found, so the
+      target may still be reachable
+    number_of_steps : int
+      The number of steps of the search, 0 when it did not search
+    path : None
+      There is no path
+    cost : float
+      inf, the distance between nodes that are not connected
+    stats : SearchStats
+      The measurements of the search that gave the answer, or None if the search does not measure
+    ...
+    Methods
+    -------
+    __bool__(self) -> Boolean
+      Always False
+    __repr__(self) -> str
+      Return the start, the target and the reason
+    """
+  DIFFERENT_COMPONENTS = "different components"
+  EXHAUSTED = "no opened nodes left"
+  NOT_FOUND = "node not found"
+  BLOCKED = "blocked cell"
+  TIMED_OUT = "time budget ran out"
+
+  def __init__(self, start, target, reason, number_of_steps=0, stats=None):
+    self.start = start
+    self.target = target
+    self.reason = reason
+    self.number_of_steps = number_of_steps
+    self.path = None
+    self.cost = inf
+    self.stats = stats
+
+
+  def __bool__(self):
+    return False
+
+
+  def __repr__(self):
+    return f"NoPath({self.start!r}, {self.target!r}, {self.reason!r}, {self.number_of_steps})"
+
+
+class SearchResult(namedtuple("SearchResult", ["path", "cost"])):
+  """
+    This class used to represent the answer of a search that found a path. It is the (path, cost)
+    tuple, so it is unpacked, indexed and compared like before, with the measurements of the
+    search that found it
+    ...
+    Attributes
+    ----------
+    path : SearchPath
+      The values of the nodes from the start node to the target node
+    cost : int
+      The cost of the path
+    stats : SearchStats
+      The measurements of the search, or None if the search does not measure
+    ...
+    Methods
+    -------
+    __repr__(self) -> str
+      Return the path and the cost like a tuple
+    """
+
+  def __new__(cls, path, cost, stats=None):
+    result = super().__new__(cls, path, cost)
+    result.stats = stats
+    return result
+
+
+  def __repr__(self):
+    return repr(tuple(self))
+
+
+class SearchPath(Sequence):
+  """
+    This class used to represent the path found by a search without copying it. The values are
+    kept in the order they were found following the parents, from the target node to the start
+    node, and the path is read backwards, so no reversed copy of the list is made
+    ...
+    Attributes
+    ----------
+    backward : list
+      The values of the nodes of the path from the target node to the start node
+    ...
+    Methods
+    -------
+    __len__(self) -> int
+      Return the number of nodes of the path
+    __getitem__(self, index) -> str
+      Return the value of a node of the path, counted from the start node
+    __iter__(self) -> iterator
+      Iterate the values from the start node to the target node
+    __reversed__(self) -> iterator
+      Iterate the values from the target node to the start node
+    __eq__(self, other) -> Boolean
+      Compare the path with another path, list or tuple
+    """
+
+  def __init__(self, backward):
+    self.backward = backward
+
+
+  def __len__(self):
+    return len(self.backward)
+
+
+  def __getitem__(self, index):
+    """
+      Return the value of the node at the given position of the path, counted from the start node.
+      A slice returns a list
+      Parameters
+      ----------
+      index : int or slice
+        Represent the position
+      ...
+      Return 
+      ------
+        str
+    """
+    if isinstance(index, slice):
+      return [self[i] for i in range(*index.indices(len(self.backward)))]
+    if index < 0:
+      index += len(self.backward)
+    if not 0 <= index < len(self.backward):
+      raise IndexError("path index out of range")
+    return self.backward[len(self.backward) - 1 - index]
+
+
+  def __iter__(self):
+    return reversed(self.backward)
+
+
+  def __reversed__(self):
+    return iter(self.backward)
+
+
+  def __contains__(self, value):
+    return value in self.backward
+
+
+  def __eq__(self, other):
+    if isinstance(other, SearchPath):
+      return self.backward == other.backward
+    if isinstance(other, (list, tuple)):
+      return len(other) == len(self.backward) and all(a == b for a, b in zip(self, other))
+    return NotImplemented
+
+
+  def __repr__(self):
+    return repr(list(self))
+
 
 class AStar:
   """
@@ -14,16 +194,51 @@ class AStar:
     target : str
       Represent the destination (target) node
     opened : list
-      Represent the list with the available nodes in the search process
-    closed : list
-      Represent the list with the closed (visited) nodes
+      Represent the binary heap with the available nodes in the search process. Every entry is a 
+      (heuristic_value, value, node) tuple, so the heap keeps the order of Node.__gt__. When a node
+      gets a better heuristic value a new entry is pushed and the old one is skipped when popped
+    opened_nodes : dict
+      Maps the value of every node that is waiting in the opened list to the node
+    closed : set
+      Represent the set with the values of the closed (visited) nodes
+    distance_from_start : dict
+      Maps the value of every reached node to its distance from the initial node
+    heuristic_value : dict
+      Maps the value of every reached node to its heuristic value
+    parent : dict
+      Maps the value of every reached node to its parent node in the best known path
+    heuristic : function
+      Estimate the distance between two nodes. It must never overestimate the real distance.
+      The default is manhattan_distance. It can be given by name ("manhattan", "euclidean",
+      "octile" or "zero") or as a function of two nodes, like LandmarkTable.lower_bound
+    estimates : dict
+      Maps the value of every reached node to its estimated distance to the target, so the
+      heuristic is calculated once per node
     number_of_steps : int
       Keep the number of steps of the algorithm
+    result : SearchResult
+      The (path, cost) found by the last search, or a NoPath if there is no path
+    stale_pops : int
+      The number of outdated entries removed from the top of the opened list
+    stats : SearchStats
+      The measurements of the last search: expansions, pushes, outdated entries, sizes of the
+      lists and the time of every part. The counters are calculated from the lists when the search
+      ends, so measuring costs almost nothing. Every search makes a new one and attaches it to its
+      result, so result.stats stays valid after the next search
+    on_expand : function
+      Called with (self, node) every time a node is extended, or None. Useful to sample or
+      profile a search
+
+    The search values of the nodes are kept in the dictionaries of the AStar object instead of the
+    Node objects, so the graph is never modified and it can be shared by several searches, one 
+    after the other or at the same time in different threads
     ...
     Methods
     -------
     manhattan_distance(self, node1, node2) -> int
       Calculate the manhattan distance between the two given nodes  
+    estimate(self, node) -> int
+      Return the estimated distance from the node to the target node
     calculate_heuristic_value(self, parent, child, target) -> int
       Calculate the heuristic value of the node (child)
     calculate_distance(self, parent, child) -> int
@@ -32,25 +247,48 @@ class AStar:
       Insert a new node either ot opened or to closed list according to list_category parameter 
     remove_from_opened(self) -> Node
       Remove from the opened list the node with the smallest heuristic value
+    discard_outdated(self) -> None
+      Remove from the top of the opened list the entries that were replaced by a better one
     opened_is_empty(self) -> Boolean
       Check if the opened list is empty or not
     get_old_node(self, node_value) -> Node
       Return the node from the opened list in case of a new node with the same value
-    calculate_path(self, target_node) -> list
+    calculate_path(self, target_node) -> SearchPath
       Calculate and return the path from the stat node to target node
     calculate_cost(self, path) -> int
-      Calculate and return the total cost of the path
+      Calculate and return the total cost of the path walking the edges again. The search
+      does not need it, the cost of the path is the distance of the target node
+    record_stats(self, search_begin, peak_open_size, reopenings) -> None
+      Fill the measurements of the search when it ends
     search(self)
         Implements the core of algorithm. This method searches, in the search space of the problem, a solution 
+    search_async(self, yield_every, yield_interval)
+        Search as a coroutine that gives the control back to the event loop between steps
+    search_steps(self) -> generator
+        The search as a generator that gives every extended node
+    expansion_events(self, batch_size) -> generator
+        The search as a generator of ExpansionEvent tuples, for drawing its progress
     """
 
-  def __init__(self, graph, start_position, target):
+  def __init__(self, graph, start_position, target, heuristic=None, on_expand=None):
     self.graph = graph
     self.start = graph.find_node(start_position)
     self.target = graph.find_node(target)
+    if heuristic is None:
+      heuristic = self.manhattan_distance
+    self.heuristic = get_heuristic(heuristic)
+    self.estimates = {}
     self.opened = []
-    self.closed = []
+    self.opened_nodes = {}
+    self.closed = set()
+    self.distance_from_start = {}
+    self.heuristic_value = {}
+    self.parent = {}
     self.number_of_steps = 0
+    self.result = None
+    self.stale_pops = 0
+    self.stats = SearchStats()
+    self.on_expand = on_expand
 
 
   def manhattan_distance(self, node1, node2):
@@ -88,18 +326,40 @@ class AStar:
     """
     for neighbor in parent.neighbors:
       if neighbor[0] == child:
-        distance = parent.distance_from_start + neighbor[1]
-        if distance < child.distance_from_start:
-          child.parent = parent
-          child.distance_from_start=distance
+        distance = self.distance_from_start.get(parent.value, inf) + neighbor[1]
+        old_distance = self.distance_from_start.get(child.value, inf)
+        if distance < old_distance:
+          self.parent[child.value] = parent
+          self.distance_from_start[child.value] = distance
           return distance
         
-        return child.distance_from_start
+        return old_distance
+
+  def estimate(self, node):
+    """
+      Return the estimated distance from the given node to the target node. It is calculated
+      the first time the node is reached and remembered for the next times
+      Parameters
+      ----------
+      node : Node
+        Represent the node
+      ...
+      Return 
+      ------
+        int
+    """
+    estimate = self.estimates.get(node.value)
+    if estimate is None:
+      estimate = self.heuristic(node, self.target)
+      self.estimates[node.value] = estimate
+    return estimate
+
 
   def calculate_heuristic_value(self, parent, child, target):
     """
       Calculate and return the heuristic value of a node which is the sum of the 
-      manhattan distance to the target node and the distance from the initial node
+      estimated distance to the target node (by default the manhattan distance) and the 
+      distance from the initial node
       ...
       Parameters
       ----------
@@ -113,7 +373,9 @@ class AStar:
       -------
         int
     """
-    return self.calculate_distance(parent, child) + self.manhattan_distance(child, target)
+    if target is not self.target:
+      return self.calculate_distance(parent, child) + self.heuristic(child, target)
+    return self.calculate_distance(parent, child) + self.estimate(child)
     
   
   def insert_to_list(self, list_category, node):
@@ -128,9 +390,10 @@ class AStar:
           The node of the problem that will be added to the frontier
     """
     if list_category == "open":
-      self.opened.append(node)
+      heapq.heappush(self.opened, (self.heuristic_value[node.value], node.value, node))
+      self.opened_nodes[node.value] = node
     else:
-      self.closed.append(node)
+      self.closed.add(node.value)
   
 
   def remove_from_opened(self):
@@ -141,12 +404,26 @@ class AStar:
       -------
         Node
     """
-    self.opened.sort()
-    node = self.opened.pop(0)
-    self.closed.append(node)
+    self.discard_outdated()
+    node = heapq.heappop(self.opened)[2]
+    del self.opened_nodes[node.value]
+    self.closed.add(node.value)
     return node
 
 
+  def discard_outdated(self):
+    """
+      Remove from the top of the opened list the entries whose heuristic value is not the current
+      heuristic value of their node. Those entries were left behind when the node was pushed again
+      with a better heuristic value
+    """
+    opened = self.opened
+    heuristic_value = self.heuristic_value
+    while opened and opened[0][0] != heuristic_value[opened[0][1]]:
+      heapq.heappop(opened)
+      self.stale_pops += 1
+
+
   def opened_is_empty(self):
     """
       Check if the the list opened is empty, so no solution found
@@ -156,6 +433,7 @@ class AStar:
         True if the list opened is empty
         False if the list opened is not empty
     """
+    self.discard_outdated()
     return len(self.opened) == 0
 
 
@@ -172,15 +450,13 @@ class AStar:
       -------
         Node
     """
-    for node in self.opened:
-      if node.value == node_value:
-        return node
-    return None 
+    return self.opened_nodes.get(node_value)
       
 
   def calculate_path(self, target_node):
     """
-      Calculate and return the path (solution) of the problem
+      Calculate and return the path (solution) of the problem, following the parents from the
+      target node to the start node once. The path is read from the start node
       ...
       Parameters
       ----------
@@ -188,16 +464,15 @@ class AStar:
         Represent final (destination) node of the problem
       Returns
       -------
-        list
+        SearchPath
     """
-    path = [target_node.value]
-    node = target_node.parent
-    while True:
-      path.append(node.value)
-      if node.parent is None:
-        break
-      node = node.parent
-    return path
+    parent = self.parent
+    backward = [target_node.value]
+    node = parent.get(target_node.value)
+    while node is not None:
+      backward.append(node.value)
+      node = parent.get(node.value)
+    return SearchPath(backward)
 
 
   def calculate_cost(self, path):
@@ -207,7 +482,7 @@ class AStar:
       Parameters
       ----------
         path : List
-        Contains all the nodes of the path from the target node to the initial node
+        Contains the values of the nodes of the path, in either direction
       Returns
       -------
         int
@@ -225,46 +500,518 @@ class AStar:
     return total_cost
       
 
+  def record_stats(self, search_begin, peak_open_size, reopenings):
+    """
+      Fill self.stats when the search ends. Every node popped from the opened list was closed,
+      so the counters are calculated from the sizes of the lists
+      ...
+      Parameters
+      ----------
+        search_begin : float
+          The value of time.perf_counter() before the first expansion
+        peak_open_size : int
+          The biggest size of the opened list
+        reopenings : int
+          The number of closed nodes reached with a shorter distance
+    """
+    stats = self.stats
+    stats.search_time = time.perf_counter() - search_begin
+    stats.found = self.target.value in self.closed
+    stats.closed_size = len(self.closed)
+    stats.expansions = stats.closed_size - stats.found
+    stats.stale_pops = self.stale_pops
+    stats.pushes = len(self.closed) + self.stale_pops + len(self.opened)
+    stats.peak_open_size = peak_open_size
+    stats.reopenings = reopenings
+
+
   def search(self):
     """
       Is the main algorithm. Search for a solution in the solution space of the problem
       Stops if the opened list is empty, so no solution found or if it find a solution. 
+      The measurements of the search are attached to the result as result.stats, and kept in
+      self.stats until the next search
       ...
       Return
       ------
-        list
+        SearchPath, int
+          The path from the start node to the target node and its cost, or a NoPath if the
+          target node can not be reached. When the graph knows that the two nodes are in different
+          components the NoPath is returned without searching
+    """
+    steps = self.search_steps()
+    while True:
+      try:
+        next(steps)
+      except StopIteration as stop:
+        return stop.value
+
+
+  async def search_async(self, yield_every=256, yield_interval=None):
+    """
+      Search like search(), giving the control back to the asyncio event loop every yield_every
+      extended nodes or every yield_interval microseconds, so many searches can share one event
+      loop. The search is cancelled like any other task, and a deadline is set with
+      asyncio.wait_for or asyncio.timeout. The search time in self.stats includes the time other
+      tasks ran while the search was waiting
+      ...
+      Parameters
+      ----------
+        yield_every : int
+          The number of extended nodes between two pauses, or None
+        yield_interval : float
+          The microseconds between two pauses, or None
+      Return
+      ------
+        SearchPath, int
+    """
+    if yield_interval is not None:
+      yield_interval /= 1000000
+    steps = self.search_steps()
+    count = 0
+    last_pause = time.perf_counter()
+    try:
+      while True:
+        try:
+          next(steps)
+        except StopIteration as stop:
+          return stop.value
+        count += 1
+        if (yield_every is not None and count >= yield_every) or \
+            (yield_interval is not None and time.perf_counter() - last_pause >= yield_interval):
+          await asyncio.sleep(0)
+          count = 0
+          last_pause = time.perf_counter()
+    finally:
+      steps.close()
+
+
+  def expansion_events(self, batch_size=None):
+    """
+      Run the search and give an ExpansionEvent for every extended node, so the progress can be
+      drawn while the search runs. search() does not create the events, so it is not slowed
+      down. When the generator ends the path and its cost are in self.result
+      ...
+      Parameters
+      ----------
+        batch_size : int
+          If given, lists of up to batch_size events are given instead of single events, so a
+          drawing can be updated once per batch
+      Return
+      ------
+        generator
+    """
+    distance_from_start = self.distance_from_start
+    heuristic_value = self.heuristic_value
+    opened_nodes = self.opened_nodes
+    batch = []
+    for node in self.search_steps():
+      event = ExpansionEvent(node.value, distance_from_start.get(node.value, inf), heuristic_value[node.value],
+                             len(opened_nodes))
+      if batch_size is None:
+        yield event
+        continue
+      batch.append(event)
+      if len(batch) >= batch_size:
+        yield batch
+        batch = []
+    if batch:
+      yield batch
+    return self.result
+
+
+  def search_steps(self):
     """
+      The search as a generator: the extended node is given after every step, and the result
+      of the search is the value of the StopIteration. search() and search_async() run it.
+      The values of the previous search are cleared first, so an instance can search again
+      ...
+      Return
+      ------
+        generator
+    """
+    begin = time.perf_counter()
+    self.stats = SearchStats()
+    # cleared in place, expansion_events keeps references to them
+    self.opened.clear()
+    self.opened_nodes.clear()
+    self.closed.clear()
+    self.distance_from_start.clear()
+    self.heuristic_value.clear()
+    self.parent.clear()
+    self.number_of_steps = 0
+    self.stale_pops = 0
+    on_expand = self.on_expand
+    peak_open_size = 0
+    reopenings = 0
+
+    # the components of the graph tell at once that there is no path, without searching
+    if not self.graph.same_component(self.start.value, self.target.value):
+      self.record_stats(begin, peak_open_size, reopenings)
+      self.result = NoPath(self.start.value, self.target.value, NoPath.DIFFERENT_COMPONENTS,
+                           stats=self.stats)
+      return self.result
+
     # Calculate the heuristic value of the starting node
-    # The distance from the starting node is 0 so only manhattan_distance is calculated
-    self.start.distance_from_start = 0
-    self.start.heuristic_value = self.manhattan_distance(self.start, self.target)
+    # The distance from the starting node is 0 so only the estimated distance is calculated
+    self.distance_from_start[self.start.value] = 0
+    self.heuristic_value[self.start.value] = self.estimate(self.start)
     # Add the starting point to opened list
-    self.opened.append(self.start)
+    self.insert_to_list("open", self.start)
+    search_begin = time.perf_counter()
+    self.stats.setup_time = search_begin - begin
 
     while True:
       self.number_of_steps += 1
+      if len(self.opened) > peak_open_size:
+        peak_open_size = len(self.opened)
 
       if self.opened_is_empty():
-        print(f"No Solution Found after {self.number_of_steps} steps!!!")
-        break
+        self.record_stats(search_begin, peak_open_size, reopenings)
+        self.result = NoPath(self.start.value, self.target.value, NoPath.EXHAUSTED, self.number_of_steps,
+                             self.stats)
+        return self.result
         
       selected_node = self.remove_from_opened()
 
       # check if the selected_node is the solution
       if selected_node == self.target:
+        self.record_stats(search_begin, peak_open_size, reopenings)
+        reconstruction_begin = time.perf_counter()
         path = self.calculate_path(selected_node)
-        total_cost = self.calculate_cost(path)
-        path.reverse()
-        return path, total_cost
+        # the distance of the target node is the cost of the path, inf if it was only reached
+        # through edges of infinite weight
+        total_cost = self.distance_from_start.get(selected_node.value, inf)
+        self.stats.reconstruction_time = time.perf_counter() - reconstruction_begin
+        self.result = SearchResult(path, total_cost, self.stats)
+        return self.result
 
+      if on_expand is not None:
+        on_expand(self, selected_node)
+      yield selected_node
       # extend the node
       new_nodes = selected_node.extend_node()
 
       # add the extended nodes in the list opened
       if len(new_nodes) > 0:
         for new_node in new_nodes:
-          new_node.heuristic_value = self.calculate_heuristic_value(selected_node, new_node, self.target)
-          if new_node not in self.closed and new_node not in self.opened:
-            new_node.parent = selected_node
+          old_node = self.get_old_node(new_node.value)
+          old_heuristic_value = self.heuristic_value.get(new_node.value, inf)
+          heuristic_value = self.calculate_heuristic_value(selected_node, new_node, self.target)
+          self.heuristic_value[new_node.value] = heuristic_value
+          if new_node.value in self.closed:
+            if heuristic_value < old_heuristic_value:
+              reopenings += 1
+            continue
+          if old_node is None:
+            self.parent[new_node.value] = selected_node
             self.insert_to_list("open", new_node)
-          
\ No newline at end of file
+          elif heuristic_value < old_heuristic_value:
+            # a better path to a node of the opened list, push it again instead of sorting the list
+            self.insert_to_list("open", new_node)
+
+
+class BidirectionalAStar:
+  """
+    This class used to represent the bidirectional A* algorithm. One search goes forward from 
+    the start node and another one goes backward from the target node, using the same (node, weight)
+    neighbors, so the edges are expected to be undirected like the ones of Graph.add_edge
+    ...
+    Both searches use the average potential of the two manhattan distances, which is consistent 
+    for both directions, so a node is never opened again once it is closed. The search stops when 
+    the two smallest heuristic values of the opened lists add up to the best path found so far
+    ...
+    Attributes
+    ----------
+    graph : Graph
+      Represent the graph (search space of the problem) 
+    start : Node
+      Represent the starting point 
+    target : Node
+      Represent the destination (target) node
+    number_of_steps : int
+      Keep the number of steps of the algorithm
+    ...
+    Methods
+    -------
+    manhattan_distance(self, node1, node2) -> int
+      Calculate the manhattan distance between the two given nodes  
+    potential(self, node) -> float
+      Calculate the potential of the node for the forward search
+    calculate_path(self, meeting, parents) -> list
+      Calculate and return the path from the start node to target node through the meeting node
+    search(self)
+        Implements the core of algorithm. This method searches, in the search space of the problem, a solution 
+    """
+
+  def __init__(self, graph, start_position, target):
+    self.graph = graph
+    self.start = graph.find_node(start_position)
+    self.target = graph.find_node(target)
+    self.number_of_steps = 0
+
+
+  def manhattan_distance(self, node1, node2):
+    """
+      Calculate and return the manhattan_distance between the two given nodes
+      Parameters
+      ----------
+      node1 : Node
+        Represent the first node 
+      node2 : Node
+        Represent the second node
+      ...
+      Return 
+      ------
+        int
+    """
+    return abs(node1.x - node2.x) + abs(node1.y - node2.y)
+
+
+  def potential(self, node):
+    """
+      Calculate and return the potential of the node for the forward search. The backward search
+      uses the same value with the opposite sign
+      Parameters
+      ----------
+      node : Node
+        Represent the node
+      ...
+      Return 
+      ------
+        float
+    """
+    return (self.manhattan_distance(node, self.target) - self.manhattan_distance(node, self.start)) / 2
+
+
+  def calculate_path(self, meeting, parents):
+    """
+      Calculate and return the path (solution) of the problem, joining the forward path from the
+      start node to the meeting node and the backward path from the meeting node to the target node
+      ...
+      Parameters
+      ----------
+        meeting : Node
+          The node where the best path found by both searches meets
+        parents : tuple
+          The parent dictionaries of the forward and the backward searches
+      Returns
+      -------
+        list
+    """
+    path = []
+    node = meeting
+    while node is not None:
+      path.append(node.value)
+      node = parents[0][node.value]
+    path.reverse()
+    node = parents[1][meeting.value]
+    while node is not None:
+      path.append(node.value)
+      node = parents[1][node.value]
+    return path
+
+
+  def search(self):
+    """
+      Is the main algorithm. Search for a solution from both ends of the problem at the same time.
+      Every step extends the node of the search with the smaller opened list
+      ...
+      Return
+      ------
+        list, int
+          The path and its cost, or a NoPath if the target node can not be reached
+    """
+    start, target = self.start, self.target
+    if not self.graph.same_component(start.value, target.value):
+      return NoPath(start.value, target.value, NoPath.DIFFERENT_COMPONENTS)
+    distances = ({start.value: 0}, {target.value: 0})
+    parents = ({start.value: None}, {target.value: None})
+    closed = (set(), set())
+    opened = ([(self.potential(start), start.value, start)], [(-self.potential(target), target.value, target)])
+    # the forward search adds the potential and the backward search subtracts it
+    signs = (1, -1)
+    best_cost = 0 if start == target else inf
+    meeting = start if start == target else None
+
+    while True:
+      # discard the entries of the nodes that were already closed
+      for side in (0, 1):
+        while opened[side] and opened[side][0][1] in closed[side]:
+          heapq.heappop(opened[side])
+      if not opened[0] or not opened[1]:
+        break
+      if opened[0][0][0] + opened[1][0][0] >= best_cost:
+        break
+
+      self.number_of_steps += 1
+      side = 0 if len(opened[0]) <= len(opened[1]) else 1
+      _, _, selected_node = heapq.heappop(opened[side])
+      closed[side].add(selected_node.value)
+
+      distance = distances[side][selected_node.value]
+      other_distances = distances[1 - side]
+      for new_node, weight in selected_node.neighbors:
+        if new_node.value in closed[side]:
+          continue
+        new_distance = distance + weight
+        if new_distance < distances[side].get(new_node.value, inf):
+          distances[side][new_node.value] = new_distance
+          parents[side][new_node.value] = selected_node
+          heuristic_value = new_distance + signs[side] * self.potential(new_node)
+          heapq.heappush(opened[side], (heuristic_value, new_node.value, new_node))
+          # check if the node was reached by the other search too
+          if new_node.value in other_distances:
+            cost = new_distance + other_distances[new_node.value]
+            if cost < best_cost:
+              best_cost = cost
+              meeting = new_node
+
+    if meeting is None:
+      return NoPath(start.value, target.value, NoPath.EXHAUSTED, self.number_of_steps)
+    return self.calculate_path(meeting, parents), best_cost
+
+
+class FrozenAStar:
+  """
+    This class used to represent the A* algorithm running on the arrays of a FrozenGraph
+    ...
+    Attributes
+    ----------
+    graph : FrozenGraph
+      Represent the graph (search space of the problem) 
+    start : int
+      Represent the id of the starting point 
+    target : int
+      Represent the id of the destination (target) node
+    heuristic : str or function
+      The name of the heuristic ("manhattan", "euclidean", "octile" or "zero") or a function of
+      two node ids, like LandmarkTable.distance_bound. It is calculated once per reached node
+    precompute : Boolean
+      If True, a named heuristic is calculated for every node at once when the search starts
+      (with NumPy when it is installed). It only pays off for searches that reach a large part
+      of the graph
+    number_of_steps : int
+      Keep the number of steps of the algorithm
+    ...
+    Methods
+    -------
+    estimate_function(self) -> function
+      Return a function that gives the estimated distance from a node id to the target node
+    calculate_path(self, parents) -> list
+      Calculate and return the path from the start node to target node
+    search(self)
+        Implements the core of algorithm. This method searches, in the search space of the problem, a solution 
+    """
+
+  def __init__(self, graph, start_position, target, heuristic="manhattan", precompute=False):
+    self.graph = graph
+    self.start = graph.find_id(start_position)
+    self.target = graph.find_id(target)
+    self.heuristic = heuristic
+    self.precompute = precompute
+    self.number_of_steps = 0
+
+
+  def estimate_function(self):
+    """
+      Return a function that gives the estimated distance from a node id to the target node,
+      calculated the first time a node is reached and remembered for the next times. With
+      precompute a named heuristic is calculated for all the nodes at once, so the search only
+      reads a list
+      ...
+      Return 
+      ------
+        function
+    """
+    heuristic, target = self.heuristic, self.target
+    if isinstance(heuristic, str):
+      if self.precompute:
+        return estimates_to(self.graph, target, heuristic).__getitem__
+      heuristic = heuristic_of_ids(self.graph, heuristic)
+
+    estimates = {}
+    def estimate(node_id):
+      value = estimates.get(node_id)
+      if value is None:
+        value = estimates[node_id] = heuristic(node_id, target)
+      return value
+    return estimate
+
+
+  def calculate_path(self, parents):
+    """
+      Calculate and return the path (solution) of the problem, from the start node to the target node
+      ...
+      Parameters
+      ----------
+        parents : list
+        The id of the parent of every node, or -1 for the nodes without parent
+      Returns
+      -------
+        list
+    """
+    path = []
+    node_id = self.target
+    while node_id != -1:
+      path.append(self.graph.values[node_id])
+      node_id = parents[node_id]
+    path.reverse()
+    return path
+
+
+  def search(self):
+    """
+      Is the main algorithm. Search for a solution in the solution space of the problem
+      Stops if there are no opened nodes, so no solution found or if it find a solution.
+      The opened nodes are kept in a binary heap ordered by heuristic value and then by value,
+      like Node.__gt__ does. Entries whose node was already closed are skipped when they are popped
+      ...
+      Return
+      ------
+        list, int
+          The path and its cost, or a NoPath if the target node can not be reached. The component
+          labels of the graph answer at once when the two nodes are not connected
+    """
+    graph = self.graph
+    values = graph.values
+    if not graph.same_component(self.start, self.target):
+      return NoPath(values[self.start], values[self.target], NoPath.DIFFERENT_COMPONENTS)
+    offsets, targets, weights, ranks = graph.offsets, graph.targets, graph.weights, graph.ranks
+    estimate = self.estimate_function()
+    number_of_nodes = graph.number_of_nodes()
+
+    distances = [inf] * number_of_nodes
+    parents = [-1] * number_of_nodes
+    closed = bytearray(number_of_nodes)
+
+    distances[self.start] = 0
+    opened = [(estimate(self.start), ranks[self.start], self.start)]
+
+    while True:
+      self.number_of_steps += 1
+
+      if not opened:
+        return NoPath(values[self.start], values[self.target], NoPath.EXHAUSTED, self.number_of_steps)
+
+      _, _, selected = heapq.heappop(opened)
+      if closed[selected]:
+        continue
+      closed[selected] = 1
+
+      # check if the selected node is the solution
+      if selected == self.target:
+        return self.calculate_path(parents), distances[selected]
+
+      # extend the node
+      distance = distances[selected]
+      for edge in range(offsets[selected], offsets[selected + 1]):
+        child = targets[edge]
+        if closed[child]:
+          continue
+        new_distance = distance + weights[edge]
+        if new_distance < distances[child]:
+          distances[child] = new_distance
+          parents[child] = selected
+          heuristic_value = new_distance + estimate(child)
+          heapq.heappush(opened, (heuristic_value, ranks[child], child))
@@ -0,0 +1,304 @@
+from math import inf
+import heapq
+import time
+
+from heuristics import get_heuristic
+from a_star import NoPath
+
+
+class AnytimeAStar:
+    """
+        This class used to represent the Anytime Repairing A* algorithm (ARA*). The first search
+        multiplies the heuristic by a weight bigger than 1, so it finds a path quickly; every next
+        search lowers the weight and reuses the values of the previous one, until the weight is 1
+        (the path is optimal) or the time budget runs out. Every path found is at most
+        `bound` times longer than the optimal one
+        ...
+        Attributes
+        ----------
+        graph : Graph
+            Represent the graph (search space of the problem)
+        start : Node
+            Represent the starting point
+        target : Node
+            Represent the destination (target) node
+        initial_weight : float
+            The weight of the heuristic in the first search
+        weight_step : float
+            How much the weight is lowered after every search
+        time_budget : float
+            Seconds the search may run, or None to run until the optimal path is found
+        heuristic : function
+            Estimate the distance between two nodes, like the heuristic of AStar
+        weight : float
+            The weight of the heuristic in the current search
+        distance_from_start : dict
+            Maps the value of every reached node to its distance from the initial node
+        parent : dict
+            Maps the value of every reached node to its parent node
+        opened : list
+            Binary heap with (key, value, node) entries
+        opened_keys : dict
+            Maps the value of every node waiting in the opened list to its current key
+        closed : set
+            The values of the nodes extended in the current search
+        inconsistent : dict
+            The closed nodes that got a better distance; they are opened again in the next search
+        number_of_steps : int
+            Keep the number of steps of the algorithm
+        timed_out : Boolean
+            True if the time budget ran out before the last search finished
+        ...
+        Methods
+        -------
+        estimate(self, node) -> float
+            Return the estimated distance from the node to the target node
+        calculate_key(self, node) -> float
+            Return the distance plus the weighted estimate of the node
+        push(self, node) -> None
+            Insert the node in the opened list with its current key
+        calculate_path(self) -> list, int
+            Calculate and return the path from the start node to target node and its cost
+        calculate_bound(self) -> float
+            Return the suboptimality bound of the current path
+        improve_path(self, deadline) -> Boolean
+            Extend nodes until the current path can not be improved with the current weight
+        solutions(self) -> generator
+            Yield a (path, cost, bound) tuple every time the path or its bound improves
+        search(self, callback=None) -> list, int
+            Return the best path found within the time budget
+    """
+    def __init__(self, graph, start_position, target, initial_weight=3.0, weight_step=0.5,
+                 time_budget=None, heuristic="manhattan"):
+        self.graph = graph
+        self.start = graph.find_node(start_position)
+        self.target = graph.find_node(target)
+        self.initial_weight = initial_weight
+        self.weight_step = weight_step
+        self.time_budget = time_budget
+        self.heuristic = get_heuristic(heuristic)
+        self.estimates = {}
+        self.weight = initial_weight
+        self.distance_from_start = {}
+        self.parent = {}
+        self.opened = []
+        self.opened_keys = {}
+        self.closed = set()
+        self.inconsistent = {}
+        self.number_of_steps = 0
+        self.timed_out = False
+
+
+    def estimate(self, node):
+        """
+            Return the estimated distance from the given node to the target node, calculated once per node
+            Parameters
+            ----------
+                node : Node
+                    Represent the node
+            ...
+            Return
+            ------
+                float
+        """
+        estimate = self.estimates.get(node.value)
+        if estimate is None:
+            estimate = self.estimates[node.value] = self.heuristic(node, self.target)
+        return estimate
+
+
+    def calculate_key(self, node):
+        """
+            Return the distance from the start plus the estimated distance multiplied by the weight
+            Parameters
+            ----------
+                node : Node
+                    Represent the node
+            ...
+            Return
+            ------
+                float
+        """
+        return self.distance_from_start.get(node.value, inf) + self.weight * self.estimate(node)
+
+
+    def push(self, node):
+        """
+            Insert the node in the opened list with its current key. Older entries of the node are
+            skipped when they are popped
+            Parameters
+            ----------
+                node : Node
+                    Represent the node
+        """
+        key = self.calculate_key(node)
+        self.opened_keys[node.value] = key
+        heapq.heappush(self.opened, (key, node.value, node))
+
+
+    def top_key(self):
+        """
+            Return the smallest key of the opened list, removing the outdated entries
+            ...
+            Return
+            ------
+                float
+        """
+        opened = self.opened
+        while opened and self.opened_keys.get(opened[0][1]) != opened[0][0]:
+            heapq.heappop(opened)
+        return opened[0][0] if opened else inf
+
+
+    def calculate_path(self):
+        """
+            Calculate and return the path (solution) of the problem from the start node to the target
+            node and its cost. While nodes are inconsistent the parents can give a path shorter than
+            the distance of the target node, so the cost is added up along the path
+            ...
+            Return
+            ------
+                list, int
+        """
+        path = []
+        cost = 0
+        node = self.target
+        while node is not None:
+            path.append(node.value)
+            parent = self.parent.get(node.value)
+            if parent is not None:
+                cost += min(weight for neighbor, weight in node.neighbors if neighbor.value == parent.value)
+            node = parent
+        path.reverse()
+        return path, cost
+
+
+    def calculate_bound(self):
+        """
+            Return the suboptimality bound of the current path: its cost divided by the smallest
+            unweighted key of the nodes still opened or inconsistent, and never bigger than the weight
+            ...
+            Return
+            ------
+                float
+        """
+        cost = self.distance_from_start.get(self.target.value, inf)
+        lower_bound = inf
+        for node in list(self.inconsistent.values()) + [entry[2] for entry in self.opened
+                                                         if self.opened_keys.get(entry[1]) == entry[0]]:
+            lower_bound = min(lower_bound, self.distance_from_start[node.value] + self.estimate(node))
+        if lower_bound == inf or cost <= lower_bound:
+            return 1.0
+        return min(self.weight, cost / lower_bound)
+
+
+    def improve_path(self, deadline):
+        """
+            Extend nodes until no opened node has a smaller key than the target node. Closed nodes
+            that get a better distance are kept as inconsistent for the next search
+            Parameters
+            ----------
+                deadline : float
+                    The value of time.perf_counter() when the search must stop, or None
+            ...
+            Return
+            ------
+                Boolean
+                    False if the time budget ran out
+        """
+        distance_from_start = self.distance_from_start
+        while self.top_key() < self.calculate_key(self.target):
+            if deadline is not None and self.number_of_steps % 64 == 0 and time.perf_counter() > deadline:
+                return False
+            self.number_of_steps += 1
+            _, _, node = heapq.heappop(self.opened)
+            del self.opened_keys[node.value]
+            self.closed.add(node.value)
+
+            distance = distance_from_start[node.value]
+            for neighbor, weight in node.neighbors:
+                new_distance = distance + weight
+                if new_distance < distance_from_start.get(neighbor.value, inf):
+                    distance_from_start[neighbor.value] = new_distance
+                    self.parent[neighbor.value] = node
+                    if neighbor.value in self.closed:
+                        self.inconsistent[neighbor.value] = neighbor
+                    else:
+                        self.push(neighbor)
+        return True
+
+
+    def solutions(self):
+        """
+            Run the searches with lower and lower weights and yield a (path, cost, bound) tuple every
+            time the path or its bound improves. Stops when the path is optimal or the time budget
+            runs out
+            ...
+            Return
+            ------
+                generator
+        """
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+
+        self.weight = self.initial_weight
+        self.distance_from_start[self.start.value] = 0
+        self.push(self.start)
+        best_cost = inf
+        best_bound = inf
+        self.timed_out = False
+        while True:
+            finished = self.improve_path(deadline)
+            self.timed_out = not finished
+            cost = self.distance_from_start.get(self.target.value, inf)
+            if cost == inf:
+                # no path exists, or the budget ran out before the first one
+                return
+            bound = self.calculate_bound()
+            if cost < best_cost or bound < best_bound:
+                best_cost, best_bound = cost, bound
+                path, path_cost = self.calculate_path()
+                yield path, path_cost, bound
+            if not finished or bound <= 1:
+                return
+
+            # next search: lower weight, inconsistent nodes opened again, keys recalculated
+            self.weight = max(1.0, min(self.weight - self.weight_step, bound))
+            waiting = [entry[2] for entry in self.opened if self.opened_keys.get(entry[1]) == entry[0]]
+            waiting.extend(self.inconsistent.values())
+            self.opened = []
+            self.opened_keys = {}
+            self.inconsistent = {}
+            self.closed = set()
+            for node in waiting:
+                if node.value not in self.opened_keys:
+                    self.push(node)
+
+
+    def search(self, callback=None):
+        """
+            Return the best path found within the time budget and its cost, like AStar.search
+            Parameters
+            ----------
+                callback : function
+                    Called with (path, cost, bound) every time the path or its bound improves
+            ...
+            Return
+            ------
+                list, int
+                    The path and its cost, or a NoPath if the target can not be reached. The
+                    reason of the NoPath is TIMED_OUT if the time budget ran out before the
+                    first path was found
+        """
+        if not self.graph.same_component(self.start.value, self.target.value):
+            return NoPath(self.start.value, self.target.value, NoPath.DIFFERENT_COMPONENTS)
+        best = None
+        for path, cost, bound in self.solutions():
+            best = (path, cost)
+            if callback is not None:
+                callback(path, cost, bound)
+        if best is None:
+            reason = NoPath.TIMED_OUT if self.timed_out else NoPath.EXHAUSTED
+            return NoPath(self.start.value, self.target.value, reason, self.number_of_steps)
+        return best
@@ -0,0 +1,214 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from math import inf
+
+from graph import Graph, FrozenGraph
+from a_star import FrozenAStar
+
+# Arrays of a FrozenGraph copied to the shared memory block, in this order
+SHARED_ARRAYS = ("offsets", "targets", "weights", "x", "y", "ranks", "components")
+
+BatchResult = namedtuple("BatchResult", ["start", "target", "path", "total_cost", "number_of_steps"])
+BatchResult.__doc__ = """
+    The answer to one (start, target) query of a batch. path is None and total_cost is inf
+    when the target can not be reached from the start
+"""
+
+# Graph attached by every worker process in _attach_graph
+_worker_memory = None
+_worker_graph = None
+
+
+def share_graph(graph):
+    """
+        Copy the arrays of the given FrozenGraph into a new shared memory block
+        ...
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot to share
+        Return
+        ------
+            SharedMemory, list
+                The memory block and its layout, a list of (name, typecode, offset, length) tuples
+    """
+    layout = []
+    size = 0
+    for name in SHARED_ARRAYS:
+        data = memoryview(getattr(graph, name))
+        layout.append((name, data.format, size, len(data)))
+        # every array holds 8-byte items, so each one starts aligned
+        size += data.nbytes
+
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, typecode, offset, length in layout:
+        data = memoryview(getattr(graph, name)).cast("B")
+        memory.buf[offset:offset + len(data)] = data
+    return memory, layout
+
+
+def attach_graph(memory, layout):
+    """
+        Build a FrozenGraph whose arrays are views of the given shared memory block.
+        The nodes of the returned graph are named by their ids
+        ...
+        Parameters
+        ----------
+            memory: SharedMemory
+                The block created by share_graph
+            layout: list
+                The layout returned by share_graph
+        Return
+        ------
+            FrozenGraph
+    """
+    arrays = {}
+    for name, typecode, offset, length in layout:
+        arrays[name] = memory.buf[offset:offset + 8 * length].cast(typecode)
+    return FrozenGraph(None, arrays["offsets"], arrays["targets"], arrays["weights"],
+                       arrays["x"], arrays["y"], arrays["ranks"], arrays["components"])
+
+
+def _attach_graph(name, layout):
+    """
+        Initializer of the worker processes. Attach the shared graph once per process
+    """
+    global _worker_memory, _worker_graph
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_graph = attach_graph(_worker_memory, layout)
+
+
+def _search_chunk(chunk):
+    """
+        Answer a chunk of (position, start id, target id) queries in a worker process
+        ...
+        Return
+        ------
+            list
+                A (position, path of ids, total cost, number of steps) tuple per query
+    """
+    results = []
+    for position, start, target in chunk:
+        algorithm = FrozenAStar(_worker_graph, start, target)
+        solution = algorithm.search()
+        # the NoPath of an unreachable target is false
+        if not solution:
+            results.append((position, None, inf, algorithm.number_of_steps))
+        else:
+            results.append((position, solution[0], solution[1], algorithm.number_of_steps))
+    return results
+
+
+class BatchSearch:
+    """
+        This class used to answer many route queries on the same graph with a pool of processes.
+        The graph is frozen and its arrays are copied once to shared memory; the workers attach to
+        that memory instead of receiving a pickled copy of the Node objects, and only node ids
+        travel between the processes
+        ...
+        Attributes
+        ----------
+        graph : FrozenGraph
+            The snapshot of the graph used by the searches
+        chunksize : int
+            The number of queries sent to a worker at once
+        memory : SharedMemory
+            The shared memory block with the arrays of the graph
+        executor : ProcessPoolExecutor
+            The pool of worker processes
+        ...
+        Methods
+        -------
+        search(self, queries, ordered=True) -> generator
+            Answer every (start, target) query and yield a BatchResult per query
+        close(self) -> None
+            Stop the workers and release the shared memory
+    """
+    def __init__(self, graph, max_workers=None, chunksize=64):
+        if isinstance(graph, Graph):
+            graph = graph.freeze()
+        self.graph = graph
+        self.chunksize = chunksize
+        self.memory, layout = share_graph(graph)
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_graph,
+                                            initargs=(self.memory.name, layout))
+
+
+    def search(self, queries, ordered=True):
+        """
+            Answer the given queries in the worker processes
+            Parameters
+            ----------
+                queries: iterable
+                    The (start, target) pairs, given by the values of the nodes
+                ordered: Boolean
+                    If True the results are yielded in the order of the queries. Otherwise they are
+                    yielded as soon as their chunk is finished
+            ...
+            Return
+            ------
+                generator of BatchResult
+        """
+        graph = self.graph
+        pairs = []
+        futures = []
+        chunk = []
+        missing = []
+        for position, (start, target) in enumerate(queries):
+            pairs.append((start, target))
+            start_id = graph.find_id(start)
+            target_id = graph.find_id(target)
+            if start_id is None or target_id is None:
+                missing.append((position, None, inf, 0))
+                continue
+            chunk.append((position, start_id, target_id))
+            if len(chunk) == self.chunksize:
+                futures.append(self.executor.submit(_search_chunk, chunk))
+                chunk = []
+        if chunk:
+            futures.append(self.executor.submit(_search_chunk, chunk))
+
+        def to_result(position, path, total_cost, number_of_steps):
+            if path is not None:
+                path = [graph.values[node_id] for node_id in path]
+            start, target = pairs[position]
+            return BatchResult(start, target, path, total_cost, number_of_steps)
+
+        if not ordered:
+            for answer in missing:
+                yield to_result(*answer)
+            for future in as_completed(futures):
+                for answer in future.result():
+                    yield to_result(*answer)
+            return
+
+        # results are kept until every query before them has been yielded
+        pending = {answer[0]: answer for answer in missing}
+        next_position = 0
+        for future in futures:
+            for answer in future.result():
+                pending[answer[0]] = answer
+            while next_position in pending:
+                yield to_result(*pending.pop(next_position))
+                next_position += 1
+        while next_position in pending:
+            yield to_result(*pending.pop(next_position))
+            next_position += 1
+
+
+    def close(self):
+        """
+            Stop the worker processes and release the shared memory block
+        """
+        self.executor.shutdown()
+        self.memory.close()
+        self.memory.unlink()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
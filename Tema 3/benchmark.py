@@ -0,0 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from graph import Graph, Node
+from a_star import AStar
+from lpa_star import LPAStar
+from ida_star import IDAStar
+from compact_graph import CompactGraph, CompactNode
+
+
+def build_grid(width, height, seed=0):
+    """
+        Build a grid graph of width x height nodes named "x,y", connected to their right and upper
+        neighbors with random weights between 1 and 5, so the manhattan distance never overestimates
+        ...
+        Return
+        ------
+            Graph
+    """
+    generator = random.Random(seed)
+    graph = Graph()
+    for x in range(width):
+        for y in range(height):
+            graph.add_node(Node(f"{x},{y}", (x, y)))
+    for x in range(width):
+        for y in range(height):
+            if x + 1 < width:
+                graph.add_edge(f"{x},{y}", f"{x + 1},{y}", generator.randint(1, 5))
+            if y + 1 < height:
+                graph.add_edge(f"{x},{y}", f"{x},{y + 1}", generator.randint(1, 5))
+    return graph
+
+
+def timed(function):
+    """
+        Call the function and return its result and the seconds it took
+    """
+    begin = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - begin
+
+
+def replanning(size=150):
+    """
+        Compare a full AStar search with the repair made by LPAStar after one edge of the
+        path changes its weight
+    """
+    graph = build_grid(size, size)
+    start, target = "0,0", f"{size - 1},{size - 1}"
+
+    algorithm = AStar(graph, start, target)
+    (path, cost), full_time = timed(algorithm.search)
+    print(f"AStar.search:           {full_time * 1000:9.2f} ms  {algorithm.number_of_steps:7} steps  cost {cost}")
+
+    planner = LPAStar(graph, start, target)
+    _, first_time = timed(planner.search)
+    print(f"LPAStar first search:   {first_time * 1000:9.2f} ms  {planner.number_of_steps:7} steps")
+
+    # make one edge in the middle of the path more expensive
+    middle = len(path) // 2
+    graph.update_edge(path[middle], path[middle + 1], 10)
+    (_, cost), repair_time = timed(planner.search)
+    print(f"LPAStar after a change: {repair_time * 1000:9.2f} ms  {planner.number_of_steps:7} steps  cost {cost}")
+
+
+def peak_rss():
+    """
+        Return the peak resident memory of the process in MB (ru_maxrss is in KB on Linux and
+        in bytes on macOS)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def measure_search(algorithm, size, max_nodes):
+    """
+        Build the grid, run one search and return the cost, the seconds, and the peak RSS
+        before and after the search. Called in a new process, so the peaks of the other
+        searches are not counted
+    """
+    graph = build_grid(size, size)
+    start, target = "0,0", f"{size - 1},{size - 1}"
+    before = peak_rss()
+    if algorithm == "IDAStar":
+        (_, cost), seconds = timed(IDAStar(graph, start, target, max_nodes=max_nodes).search)
+    else:
+        (_, cost), seconds = timed(AStar(graph, start, target).search)
+    return cost, seconds, before, peak_rss()
+
+
+def memory_bounded(size=60, max_nodes=20000):
+    """
+        Compare the peak RSS of AStar with the one of IDAStar, each in its own process
+    """
+    for algorithm in ("AStar", "IDAStar"):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            cost, seconds, before, after = executor.submit(measure_search, algorithm, size, max_nodes).result()
+        print(f"{algorithm + ':':8} {seconds * 1000:9.2f} ms  cost {cost}  "
+              f"peak RSS {before:7.1f} MB after the graph, {after:7.1f} MB after the search")
+
+
+def graph_memory(graph_class, node_class, side):
+    """
+        Build a side x side grid with the given classes and return the bytes allocated for the
+        nodes and for the edges, measured with tracemalloc
+    """
+    tracemalloc.start()
+    begin = tracemalloc.get_traced_memory()[0]
+    graph = graph_class()
+    for x in range(side):
+        for y in range(side):
+            graph.add_node(node_class(f"{x},{y}", (x, y)))
+    nodes_end = tracemalloc.get_traced_memory()[0]
+    number_of_edges = 0
+    for x in range(side):
+        for y in range(side):
+            if x + 1 < side:
+                graph.add_edge(f"{x},{y}", f"{x + 1},{y}", 1 + (x + y) % 5)
+                number_of_edges += 1
+            if y + 1 < side:
+                graph.add_edge(f"{x},{y}", f"{x},{y + 1}", 1 + (x * y) % 5)
+                number_of_edges += 1
+    edges_end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return nodes_end - begin, edges_end - nodes_end, number_of_edges
+
+
+def memory(number_of_nodes=10 ** 6):
+    """
+        Compare the memory used by Graph and Node with the one used by CompactGraph and
+        CompactNode, in bytes per node (value string included) and per undirected edge
+    """
+    side = int(number_of_nodes ** 0.5)
+    for graph_class, node_class in ((Graph, Node), (CompactGraph, CompactNode)):
+        node_bytes, edge_bytes, number_of_edges = graph_memory(graph_class, node_class, side)
+        print(f"{graph_class.__name__ + ':':14} {side * side} nodes {node_bytes / (side * side):7.1f} bytes/node  "
+              f"{number_of_edges} edges {edge_bytes / number_of_edges:7.1f} bytes/edge")
+
+
+BENCHMARKS = {
+    "replanning": replanning,
+    "memory_bounded": memory_bounded,
+    "memory": memory,
+}
+
+
+if __name__ == '__main__':
+    # python benchmark.py [name ...] runs the given benchmarks, or all of them
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"=== {name} ===")
+        BENCHMARKS[name]()
@@ -0,0 +1,380 @@
+from array import array
+from math import inf
+
+from graph import Node, Graph, FrozenGraph
+
+
+class CompactNode:
+    """
+        This class used to represent a node of a CompactGraph. It has the attributes and the methods
+        of Node, but it uses __slots__ instead of a __dict__ and keeps no list of neighbors: the edges
+        are stored in the typed arrays of its graph, and neighbors builds the (node, weight) list
+        when it is read
+        ...
+        Attributes
+        ----------
+        value : str
+            Represent the value of the node
+        x : int
+            Represent the x-coordinate of the node
+        y : int
+            Represent the y-coordinate of the node
+        id : int
+            The position of the node in the nodes of its graph
+        graph : CompactGraph
+            The graph that keeps the edges of the node
+        heuristic_value : int
+            Left for the scripts that write their own search, like Node.heuristic_value
+        distance_from_start
+            Left for the scripts that write their own search, like Node.distance_from_start
+        parent : Node
+            Left for the scripts that write their own search, like Node.parent
+        ...
+        Methods
+        -------
+        neighbors(self) -> list
+            Return the (node, weight) tuples of the edges of the node
+        has_neighbors(self) -> Boolean
+            Check if the current node is connected with other nodes
+        number_of_neighbors(self) -> int
+            Calculate and return the number the of the neighbors
+        add_neighboor(self, neighboor) -> None
+            Add an edge from the current node to the node of the (node, weight) tuple
+        extend_node(self) -> list
+            Return a list of nodes with which the current node is connected
+        __gt__(self, other) -> Boolean
+            Compare the heuristic values and then the values, like Node.__gt__
+        __eq__(self, other) -> Boolean
+            Determines if two nodes are equal or not, checking their values
+        __hash__(self) -> int
+            Hash the node by its value
+        __str__(self) -> str
+            Prints the node data
+    """
+    __slots__ = ("value", "x", "y", "id", "graph", "heuristic_value", "distance_from_start", "parent")
+
+    def __init__(self, value, cordinates):
+        self.value = value
+        self.x = cordinates[0]
+        self.y = cordinates[1]
+        self.id = -1
+        self.graph = None
+        self.heuristic_value = -1
+        self.distance_from_start = inf
+        self.parent = None
+
+
+    @property
+    def neighbors(self):
+        """
+            The (node, weight) tuples of the edges of the node, built from the arrays of the graph
+            every time it is read. Changing the list does not change the graph, use
+            CompactGraph.add_edge and CompactGraph.update_edge
+        """
+        if self.graph is None:
+            return []
+        nodes = self.graph.nodes
+        return [(nodes[target], weight) for target, weight in self.graph.edges_of(self.id)]
+
+
+    def has_neighbors(self):
+        """
+            Return True if the current node is connected with at least another node.
+            Otherwiese return false
+        """
+        return self.graph is not None and self.graph.first_edge[self.id] != -1
+
+
+    def number_of_neighbors(self):
+        """
+            Return the number of nodes with which the current node is connected
+        """
+        if self.graph is None:
+            return 0
+        return sum(1 for _ in self.graph.edges_of(self.id))
+
+
+    def add_neighboor(self, neighboor):
+        """
+            Add an edge from the current node to the given node, only in this direction like
+            Node.add_neighboor. Both nodes must be in the same graph
+            Paramenters
+            ----------
+            neighboor : tuple with the nodo and the weight
+                Represent the node with which a new connection is created
+        """
+        node, weight = neighboor
+        self.graph.append_edge(self.id, node.id, weight)
+
+
+    def extend_node(self):
+        """
+            Extends the current node, creating and returning a list with all connected nodes
+            Returns
+            -------
+                List
+        """
+        if self.graph is None:
+            return []
+        nodes = self.graph.nodes
+        return [nodes[target] for target, _ in self.graph.edges_of(self.id)]
+
+
+    def __gt__(self, other):
+        """
+            Compare the heuristic values and then the values of the nodes, like Node.__gt__
+        """
+        if isinstance(other, (Node, CompactNode)):
+            if self.heuristic_value > other.heuristic_value:
+                return True
+            if self.heuristic_value < other.heuristic_value:
+                return False
+            return self.value > other.value
+
+
+    def __eq__(self, other):
+        """
+            Two nodes are equal if they have the same value, like Node.__eq__
+        """
+        if isinstance(other, (Node, CompactNode)):
+            return self.value == other.value
+        return self.value == other
+
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+    def __str__(self):
+        return self.value
+
+
+class CompactGraph(Graph):
+    """
+        This class used to represent a Graph that uses less memory: the nodes are CompactNode
+        objects and the edges are kept in typed arrays, as linked lists of edges per node, instead
+        of a list of (node, weight) tuples per node. add_edge, update_edge, are_connected, freeze
+        and the other methods of Graph work the same way. Reading node.neighbors builds a list,
+        so the searches that read it many times are slower than on a Graph; freeze the graph for
+        fast searches
+        ...
+        Attributes
+        ----------
+        first_edge : array
+            The first edge of every node, -1 for a node without edges
+        last_edge : array
+            The last edge of every node, so new edges are added at the end like in a list
+        next_edge : array
+            The next edge of the same node after every edge, -1 for the last one
+        edge_targets : array
+            The id of the node at the other end of every edge
+        edge_weights : array
+            The weight of every edge. The weights are integers ('q') until a float weight is added
+        ...
+        Methods
+        -------
+        append_edge(self, node_id, target_id, weight) -> None
+            Add an edge in one direction and join the components of its nodes
+        components_complete(self) -> Boolean
+            Always True, every edge is added by append_edge
+        edges_of(self, node_id) -> generator
+            Give the (target id, weight) of every edge of the node
+    """
+    def __init__(self, nodes=None):
+        self.first_edge = array('q')
+        self.last_edge = array('q')
+        self.next_edge = array('q')
+        self.edge_targets = array('q')
+        self.edge_weights = array('q')
+        super().__init__(nodes)
+
+
+    def add_node(self, node):
+        """
+            Add a new node (vertex) in the graph. A Node is copied to a new CompactNode (without
+            its neighbors); a CompactNode already in another graph can not be added
+            Parameters
+            ----------
+                node: CompactNode or Node
+                    Represent the inserted node in the graph
+        """
+        if node.value in self.index:
+            print(f"Error: A node with value {node.value} already exists")
+            return
+        if not isinstance(node, CompactNode):
+            node = CompactNode(node.value, (node.x, node.y))
+        elif node.graph is not None:
+            print(f"Error: The node {node.value} belongs to another graph")
+            return
+        node.id = len(self.nodes)
+        node.graph = self
+        self.nodes.append(node)
+        self.index[node.value] = node
+        self.components[node.value] = node.value
+        self.component_sizes[node.value] = 1
+        self.first_edge.append(-1)
+        self.last_edge.append(-1)
+        self.version += 1
+
+
+    def append_edge(self, node_id, target_id, weight):
+        """
+            Add an edge from one node to another, only in this direction, and join the components
+            of the two nodes
+            Parameters
+            ----------
+                node_id: int
+                    The id of the first node
+                target_id: int
+                    The id of the second node
+                weight:
+                    The weight of the edge
+        """
+        if self.edge_weights.typecode == 'q' and not isinstance(weight, int):
+            self.edge_weights = array('d', self.edge_weights)
+        edge = len(self.edge_targets)
+        self.edge_targets.append(target_id)
+        self.edge_weights.append(weight)
+        self.next_edge.append(-1)
+        if self.first_edge[node_id] == -1:
+            self.first_edge[node_id] = edge
+        else:
+            self.next_edge[self.last_edge[node_id]] = edge
+        self.last_edge[node_id] = edge
+        self.join_components(self.nodes[node_id].value, self.nodes[target_id].value)
+
+
+    def components_complete(self):
+        """
+            Return True: CompactNode.add_neighboor and add_edge both go through append_edge, so
+            the components always know every edge
+            ...
+            Return
+            ------
+                Boolean
+        """
+        return True
+
+
+    def edges_of(self, node_id):
+        """
+            Give the (target id, weight) of every edge of the node, in the order they were added
+            Parameters
+            ----------
+                node_id: int
+                    The id of the node
+            ...
+            Return
+            ------
+                generator
+        """
+        edge_targets, edge_weights, next_edge = self.edge_targets, self.edge_weights, self.next_edge
+        edge = self.first_edge[node_id]
+        while edge != -1:
+            yield edge_targets[edge], edge_weights[edge]
+            edge = next_edge[edge]
+
+
+    def add_edge(self, value1, value2, weight=1):
+        """
+            Add a new edge between the two given nodes, in both directions like Graph.add_edge
+            Parameters
+            ----------
+                value1: str
+                    The value of the first node
+                value2: str
+                    The value of the second node
+                weight:
+                    The weight of the edge. Default value 1
+        """
+        node1 = self.find_node(value1)
+        node2 = self.find_node(value2)
+
+        if (node1 is not None) and (node2 is not None):
+            self.append_edge(node1.id, node2.id, weight)
+            self.append_edge(node2.id, node1.id, weight)
+            self.notify(node1, node2)
+        else:
+            print("Error: One or more nodes were not found")
+
+
+    def update_edge(self, value1, value2, weight):
+        """
+            Change the weight of the edge between the two given nodes, in both directions.
+            A weight of inf closes the edge
+            Parameters
+            ----------
+                value1: str
+                    The value of the first node
+                value2: str
+                    The value of the second node
+                weight:
+                    The new weight of the edge
+        """
+        node1 = self.find_node(value1)
+        node2 = self.find_node(value2)
+
+        if (node1 is None) or (node2 is None):
+            print("Error: One or more nodes were not found")
+            return
+        if not self.are_connected(value1, value2):
+            print(f"Error: There is no edge between {value1} and {value2}")
+            return
+
+        if self.edge_weights.typecode == 'q' and not isinstance(weight, int):
+            self.edge_weights = array('d', self.edge_weights)
+        for node, other in ((node1, node2), (node2, node1)):
+            edge = self.first_edge[node.id]
+            while edge != -1:
+                if self.edge_targets[edge] == other.id:
+                    self.edge_weights[edge] = weight
+                edge = self.next_edge[edge]
+        self.notify(node1, node2)
+
+
+    def are_connected(self, node_one, node_two):
+        """
+            Return True if the given nodes are connected. Otherwise return False
+            ...
+            Parameters
+            ----------
+                node_one: str
+                    The value of the first node
+                node_two: str
+                    The value of the second node
+            Return
+            ------
+                Boolean
+        """
+        node_one = self.find_node(node_one)
+        node_two = self.find_node(node_two)
+        if (node_one is None) or (node_two is None):
+            return False
+        return any(target == node_two.id for target, _ in self.edges_of(node_one.id))
+
+
+    def freeze(self):
+        """
+            Build the FrozenGraph of the graph straight from the arrays of edges, like Graph.freeze
+            ...
+            Return
+            ------
+                FrozenGraph
+        """
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array(self.edge_weights.typecode)
+        for node_id in range(len(self.nodes)):
+            for target, weight in self.edges_of(node_id):
+                targets.append(target)
+                weights.append(weight)
+            offsets.append(len(targets))
+
+        return FrozenGraph(
+            [node.value for node in self.nodes],
+            offsets,
+            targets,
+            weights,
+            array('d', [node.x for node in self.nodes]),
+            array('d', [node.y for node in self.nodes]),
+        )
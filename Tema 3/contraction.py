@@ -0,0 +1,353 @@
+from array import array
+from math import inf
+import heapq
+
+from graph import Graph
+from a_star import NoPath
+
+# First bytes of a file written by ContractionHierarchy.save
+MAGIC = b"CH01"
+
+
+class ContractionHierarchy:
+    """
+        This class used to represent a contraction hierarchy of an undirected graph. The nodes are
+        contracted one by one; when a node is removed, a shortcut edge is added between two of its
+        neighbors if the path through the removed node is the only shortest path between them.
+        A query only has to follow edges towards nodes contracted later (upward edges), from both
+        ends, so it settles a few nodes even on big graphs
+        ...
+        Attributes
+        ----------
+        values : list
+            The value of every node, indexed by the node id (its position in Graph.nodes)
+        index : dict
+            Maps the value of every node to its id
+        ranks : array
+            The position of every node in the contraction order
+        offsets : array
+            The upward edges of the node i are stored between offsets[i] and offsets[i+1]
+        targets : array
+            The id of the node at the other end of every upward edge
+        weights : array
+            The weight of every upward edge
+        middles : array
+            The node contracted by every shortcut, or -1 for the edges of the original graph
+        ...
+        Methods
+        -------
+        build(graph, settled_limit=64) -> ContractionHierarchy
+            Contract the nodes of the graph and return the hierarchy
+        load(path, graph) -> ContractionHierarchy
+            Read a hierarchy written by save for the given graph
+        save(self, path) -> None
+            Write the hierarchy in a binary file
+        edge_middle(self, node1, node2) -> int
+            Return the node contracted by the edge between the two given nodes
+        unpack(self, path) -> list
+            Replace every shortcut of a path of ids by the edges it represents
+        search(self, start_position, target) -> list, int
+            Find the shortest path between the two given nodes
+    """
+    def __init__(self, values, ranks, offsets, targets, weights, middles):
+        self.values = values
+        self.index = {value: i for i, value in enumerate(values)}
+        self.ranks = ranks
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+
+
+    @classmethod
+    def build(cls, graph, settled_limit=64):
+        """
+            Contract every node of the graph. The next node to contract is the one with the smallest
+            edge difference (shortcuts added minus edges removed) plus number of contracted neighbors;
+            the priorities are updated lazily when a node reaches the top of the heap
+            Parameters
+            ----------
+                graph: Graph or FrozenGraph
+                    The graph of the problem
+                settled_limit: int
+                    The number of nodes a witness search may settle before giving up. A bigger value
+                    adds fewer shortcuts but takes longer. Default value is 64
+            ...
+            Return
+            ------
+                ContractionHierarchy
+        """
+        if isinstance(graph, Graph):
+            graph = graph.freeze()
+        number_of_nodes = graph.number_of_nodes()
+
+        # neighbors of every node not contracted yet: {neighbor: (weight, middle)}
+        adjacency = [{} for _ in range(number_of_nodes)]
+        for node_id in range(number_of_nodes):
+            for neighbor, weight in graph.edges_from(node_id):
+                if neighbor != node_id and weight < adjacency[node_id].get(neighbor, (inf,))[0]:
+                    adjacency[node_id][neighbor] = (weight, -1)
+                    adjacency[neighbor][node_id] = (weight, -1)
+
+        def witness_distances(source, skipped, limit):
+            # local Dijkstra that avoids the node being contracted
+            distances = {source: 0}
+            opened = [(0, source)]
+            settled = 0
+            while opened and settled < settled_limit:
+                distance, node_id = heapq.heappop(opened)
+                if distance > distances[node_id]:
+                    continue
+                if distance > limit:
+                    break
+                settled += 1
+                for neighbor, (weight, _) in adjacency[node_id].items():
+                    if neighbor == skipped:
+                        continue
+                    new_distance = distance + weight
+                    if new_distance < distances.get(neighbor, inf):
+                        distances[neighbor] = new_distance
+                        heapq.heappush(opened, (new_distance, neighbor))
+            return distances
+
+        def shortcuts_of(node_id):
+            neighbors = list(adjacency[node_id].items())
+            shortcuts = []
+            for i, (first, (first_weight, _)) in enumerate(neighbors):
+                others = neighbors[i + 1:]
+                if not others:
+                    break
+                limit = first_weight + max(weight for _, (weight, _) in others)
+                distances = witness_distances(first, node_id, limit)
+                for second, (second_weight, _) in others:
+                    through = first_weight + second_weight
+                    if distances.get(second, inf) > through:
+                        shortcuts.append((first, second, through))
+            return shortcuts
+
+        contracted_neighbors = [0] * number_of_nodes
+
+        def priority(node_id, shortcuts):
+            return len(shortcuts) - len(adjacency[node_id]) + contracted_neighbors[node_id]
+
+        opened = [(priority(node_id, shortcuts_of(node_id)), node_id) for node_id in range(number_of_nodes)]
+        heapq.heapify(opened)
+        ranks = array('q', bytes(8 * number_of_nodes))
+        upward = [None] * number_of_nodes
+        rank = 0
+        while opened:
+            _, node_id = heapq.heappop(opened)
+            shortcuts = shortcuts_of(node_id)
+            new_priority = priority(node_id, shortcuts)
+            if opened and new_priority > opened[0][0]:
+                heapq.heappush(opened, (new_priority, node_id))
+                continue
+
+            # contract the node: its remaining neighbors are the ones contracted after it
+            ranks[node_id] = rank
+            rank += 1
+            upward[node_id] = list(adjacency[node_id].items())
+            for first, second, through in shortcuts:
+                if through < adjacency[first].get(second, (inf,))[0]:
+                    adjacency[first][second] = (through, node_id)
+                    adjacency[second][first] = (through, node_id)
+            for neighbor in adjacency[node_id]:
+                del adjacency[neighbor][node_id]
+                contracted_neighbors[neighbor] += 1
+            adjacency[node_id] = {}
+
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array(memoryview(graph.weights).format)
+        middles = array('q')
+        for node_id in range(number_of_nodes):
+            for neighbor, (weight, middle) in upward[node_id]:
+                targets.append(neighbor)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        return cls(list(graph.values), ranks, offsets, targets, weights, middles)
+
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+            Read a hierarchy written by save. The graph must have the same nodes, in the same order,
+            as the graph used to build the hierarchy
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+                graph: Graph or FrozenGraph
+                    The graph the hierarchy belongs to
+            ...
+            Return
+            ------
+                ContractionHierarchy
+        """
+        if isinstance(graph, Graph):
+            values = [node.value for node in graph.nodes]
+        else:
+            values = list(graph.values)
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a contraction hierarchy")
+            typecode = file.read(1).decode()
+            sizes = array('q')
+            sizes.fromfile(file, 2)
+            number_of_nodes, number_of_edges = sizes
+            if number_of_nodes != len(values):
+                raise ValueError(f"The hierarchy has {number_of_nodes} nodes but the graph has {len(values)}")
+            ranks = array('q')
+            ranks.fromfile(file, number_of_nodes)
+            offsets = array('q')
+            offsets.fromfile(file, number_of_nodes + 1)
+            targets = array('q')
+            targets.fromfile(file, number_of_edges)
+            weights = array(typecode)
+            weights.fromfile(file, number_of_edges)
+            middles = array('q')
+            middles.fromfile(file, number_of_edges)
+        return cls(values, ranks, offsets, targets, weights, middles)
+
+
+    def save(self, path):
+        """
+            Write the hierarchy (order of the nodes and upward edges with their shortcuts) in a binary
+            file, with the native byte order. The values of the nodes are not written
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+        """
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            file.write(self.weights.typecode.encode())
+            array('q', [len(self.ranks), len(self.targets)]).tofile(file)
+            self.ranks.tofile(file)
+            self.offsets.tofile(file)
+            self.targets.tofile(file)
+            self.weights.tofile(file)
+            self.middles.tofile(file)
+
+
+    def edge_middle(self, node1, node2):
+        """
+            Return the node contracted by the edge between the two given nodes, or -1 if the edge
+            belongs to the original graph. The edge is stored with the node contracted first
+            Parameters
+            ----------
+                node1: int
+                    The id of the first node
+                node2: int
+                    The id of the second node
+            ...
+            Return
+            ------
+                int
+        """
+        if self.ranks[node1] > self.ranks[node2]:
+            node1, node2 = node2, node1
+        for edge in range(self.offsets[node1], self.offsets[node1 + 1]):
+            if self.targets[edge] == node2:
+                return self.middles[edge]
+        raise ValueError(f"There is no edge between {self.values[node1]} and {self.values[node2]}")
+
+
+    def unpack(self, path):
+        """
+            Replace every shortcut of the given path by the edges of the original graph it represents
+            Parameters
+            ----------
+                path: list
+                    The ids of the nodes of a path that uses upward edges and shortcuts
+            ...
+            Return
+            ------
+                list
+                    The ids of the nodes of the same path in the original graph
+        """
+        unpacked = path[:1]
+        for i in range(len(path) - 1):
+            pending = [(path[i], path[i + 1])]
+            while pending:
+                node1, node2 = pending.pop()
+                middle = self.edge_middle(node1, node2)
+                if middle == -1:
+                    unpacked.append(node2)
+                else:
+                    pending.append((middle, node2))
+                    pending.append((node1, middle))
+        return unpacked
+
+
+    def search(self, start_position, target):
+        """
+            Find the shortest path between the two given nodes with a bidirectional Dijkstra that
+            only follows upward edges. The two searches meet at the node with the highest rank of
+            the shortest path
+            Parameters
+            ----------
+                start_position: str
+                    The value of the starting node
+                target: str
+                    The value of the destination node
+            ...
+            Return
+            ------
+                list, int
+                    The path and its cost, or a NoPath if the target can not be reached or one
+                    of the nodes is not in the graph
+        """
+        start = self.index.get(start_position)
+        target_id = self.index.get(target)
+        if start is None or target_id is None:
+            return NoPath(start_position, target, NoPath.NOT_FOUND)
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        distances = ({start: 0}, {target_id: 0})
+        parents = ({start: -1}, {target_id: -1})
+        opened = ([(0, start)], [(0, target_id)])
+        best_cost = inf
+        meeting = -1
+
+        while True:
+            # extend the search whose next node is closer, while it can still improve the path
+            side = -1
+            for candidate in (0, 1):
+                if opened[candidate] and opened[candidate][0][0] < best_cost:
+                    if side == -1 or opened[candidate][0][0] < opened[side][0][0]:
+                        side = candidate
+            if side == -1:
+                break
+
+            distance, node_id = heapq.heappop(opened[side])
+            if distance > distances[side][node_id]:
+                continue
+            other_distance = distances[1 - side].get(node_id)
+            if other_distance is not None and distance + other_distance < best_cost:
+                best_cost = distance + other_distance
+                meeting = node_id
+
+            for edge in range(offsets[node_id], offsets[node_id + 1]):
+                child = targets[edge]
+                new_distance = distance + weights[edge]
+                if new_distance < distances[side].get(child, inf):
+                    distances[side][child] = new_distance
+                    parents[side][child] = node_id
+                    heapq.heappush(opened[side], (new_distance, child))
+
+        if meeting == -1:
+            return NoPath(start_position, target, NoPath.EXHAUSTED)
+
+        path = []
+        node_id = meeting
+        while node_id != -1:
+            path.append(node_id)
+            node_id = parents[0][node_id]
+        path.reverse()
+        node_id = parents[1][meeting]
+        while node_id != -1:
+            path.append(node_id)
+            node_id = parents[1][node_id]
+        return [self.values[node_id] for node_id in self.unpack(path)], best_cost
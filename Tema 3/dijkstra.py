@@ -0,0 +1,278 @@
+from array import array
+from collections import OrderedDict
+from math import inf
+import heapq
+
+from graph import Graph
+from a_star import NoPath
+
+
+def shortest_paths(graph, source):
+    """
+        Calculate the distance from the source node to every node of a FrozenGraph (Dijkstra),
+        and the node before every node in its shortest path
+        ...
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot of the graph
+            source: int
+                The id of the source node
+        Return
+        ------
+            array, array
+                The distance of every node (inf for the nodes that can not be reached) and the id
+                of the predecessor of every node (-1 for the source and the nodes not reached)
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    number_of_nodes = graph.number_of_nodes()
+    distances = array('d', [inf]) * number_of_nodes
+    predecessors = array('q', [-1]) * number_of_nodes
+    distances[source] = 0
+    opened = [(0, source)]
+    while opened:
+        distance, node_id = heapq.heappop(opened)
+        if distance > distances[node_id]:
+            continue
+        for edge in range(offsets[node_id], offsets[node_id + 1]):
+            child = targets[edge]
+            new_distance = distance + weights[edge]
+            if new_distance < distances[child]:
+                distances[child] = new_distance
+                predecessors[child] = node_id
+                heapq.heappush(opened, (new_distance, child))
+    return distances, predecessors
+
+
+def id_of(graph, value):
+    """
+        Return the id of the node with the given value in a FrozenGraph, raising a ValueError if
+        there is no such node
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot of the graph
+            value: str
+                The value of the node
+        ...
+        Return
+        ------
+            int
+    """
+    node_id = graph.find_id(value)
+    if node_id is None:
+        raise ValueError(f"The node {value} was not found")
+    return node_id
+
+
+class ShortestPathTree:
+    """
+        This class used to represent the shortest paths from one node to every node of a FrozenGraph
+        ...
+        Attributes
+        ----------
+        graph : FrozenGraph
+            The snapshot the tree was calculated on
+        source : int
+            The id of the source node
+        distances : array
+            The distance from the source to every node
+        predecessors : array
+            The id of the node before every node in its shortest path
+        ...
+        Methods
+        -------
+        distance_to(self, target) -> int
+            Return the distance from the source to the node with the given value
+        path_to(self, target) -> list
+            Return the shortest path from the source to the node with the given value
+        number_of_bytes(self) -> int
+            Return the memory used by the arrays of the tree
+    """
+    def __init__(self, graph, source):
+        self.graph = graph
+        self.source = source
+        self.distances, self.predecessors = shortest_paths(graph, source)
+
+
+    def distance_to(self, target):
+        """
+            Return the distance from the source to the given node, or inf if it can not be reached.
+            The distance is an int when the weights of the graph are integers. A ValueError is
+            raised if the node is not in the graph
+            Parameters
+            ----------
+                target: str
+                    The value of the node
+            ...
+            Return
+            ------
+                int
+        """
+        distance = self.distances[id_of(self.graph, target)]
+        if distance != inf and memoryview(self.graph.weights).format == 'q':
+            return int(distance)
+        return distance
+
+
+    def path_to(self, target):
+        """
+            Return the shortest path from the source to the given node following the predecessors,
+            or None if the node can not be reached. A ValueError is raised if the node is not in
+            the graph
+            Parameters
+            ----------
+                target: str
+                    The value of the node
+            ...
+            Return
+            ------
+                list
+        """
+        node_id = id_of(self.graph, target)
+        if self.distances[node_id] == inf:
+            return None
+        path = []
+        while node_id != -1:
+            path.append(self.graph.values[node_id])
+            node_id = self.predecessors[node_id]
+        path.reverse()
+        return path
+
+
+    def number_of_bytes(self):
+        """
+            Return the number of bytes used by the distances and the predecessors
+            ...
+            Return
+            ------
+                int
+        """
+        return memoryview(self.distances).nbytes + memoryview(self.predecessors).nbytes
+
+
+class ShortestPathCache:
+    """
+        This class used to keep the shortest path trees of the most used source nodes. A query
+        from a source already in the cache only follows the predecessors of the target. When the
+        cache uses more memory than allowed the least recently used trees are removed. When the
+        version of the graph changes (new node, new edge or new weight) the cache is emptied
+        ...
+        Attributes
+        ----------
+        graph : Graph or FrozenGraph
+            Represent the graph (search space of the problem)
+        max_bytes : int
+            The memory the trees may use
+        trees : OrderedDict
+            The cached trees by the value of their source, from the least to the most recently used
+        number_of_bytes : int
+            The memory used by the cached trees
+        snapshot : FrozenGraph
+            The snapshot of the graph used to calculate the trees
+        version : int
+            The version of the graph when the snapshot was taken
+        ...
+        Methods
+        -------
+        tree(self, start) -> ShortestPathTree
+            Return the shortest path tree of the given source node
+        search(self, start_position, target) -> list, int
+            Return the shortest path between two nodes and its cost
+        graph_has(self, value) -> Boolean
+            Check if a node with the given value exists in the graph
+        clear(self) -> None
+            Remove every tree from the cache
+    """
+    def __init__(self, graph, max_bytes=64 * 1024 * 1024):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.number_of_bytes = 0
+        self.snapshot = None
+        self.version = None
+
+
+    def clear(self):
+        """
+            Remove every tree and forget the snapshot of the graph
+        """
+        self.trees.clear()
+        self.number_of_bytes = 0
+        self.snapshot = None
+
+
+    def tree(self, start):
+        """
+            Return the shortest path tree of the given source node, calculating it if it is
+            not in the cache. A ValueError is raised if the node is not in the graph
+            Parameters
+            ----------
+                start: str
+                    The value of the source node
+            ...
+            Return
+            ------
+                ShortestPathTree
+        """
+        if self.version != self.graph.version:
+            # the graph changed after the snapshot was taken
+            self.clear()
+        if self.snapshot is None:
+            self.snapshot = self.graph.freeze() if isinstance(self.graph, Graph) else self.graph
+            self.version = self.graph.version
+
+        tree = self.trees.get(start)
+        if tree is not None:
+            self.trees.move_to_end(start)
+            return tree
+
+        tree = ShortestPathTree(self.snapshot, id_of(self.snapshot, start))
+        self.trees[start] = tree
+        self.number_of_bytes += tree.number_of_bytes()
+        while self.number_of_bytes > self.max_bytes and len(self.trees) > 1:
+            _, removed = self.trees.popitem(last=False)
+            self.number_of_bytes -= removed.number_of_bytes()
+        return tree
+
+
+    def search(self, start_position, target):
+        """
+            Return the shortest path between the two given nodes and its cost, like AStar.search
+            Parameters
+            ----------
+                start_position: str
+                    The value of the starting node
+                target: str
+                    The value of the destination node
+            ...
+            Return
+            ------
+                list, int
+                    The path and its cost, or a NoPath if the target can not be reached or one
+                    of the nodes is not in the graph
+        """
+        if not self.graph_has(start_position) or not self.graph_has(target):
+            return NoPath(start_position, target, NoPath.NOT_FOUND)
+        tree = self.tree(start_position)
+        path = tree.path_to(target)
+        if path is None:
+            return NoPath(start_position, target, NoPath.EXHAUSTED)
+        return path, tree.distance_to(target)
+
+
+    def graph_has(self, value):
+        """
+            Return True if a node with the given value exists in the graph
+            Parameters
+            ----------
+                value: str
+                    The value of the node
+            ...
+            Return
+            ------
+                Boolean
+        """
+        if isinstance(self.graph, Graph):
+            return self.graph.has_node(value)
+        return self.graph.find_id(value) is not None
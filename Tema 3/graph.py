@@ -1,4 +1,7 @@
 from math import inf 
+from array import array
+import threading
+import weakref
 
 class Node:
     """ 
@@ -21,6 +24,13 @@ class Node:
         parent : Node
             Represents the parent-node of the current node. Default value is None
 
+        The search values (heuristic_value, distance_from_start and parent) are left for the scripts
+        that write their own search. AStar keeps them per search and never modifies the nodes
+
+        graphs : tuple
+            Weak references to the graphs whose components know the node, so add_neighboor can
+            tell them about the new edge. Empty for a node that is in no graph
+
         ...
         Methods
         -------
@@ -30,14 +40,22 @@ class Node:
             Calculate and return the number the of the neighbors 
         add_neighboor(self, neighboor) -> None
             Add a new neighbor in the list of neighbors
+        add_graph(self, graph) -> None
+            Remember a graph to tell about the new neighbors
         extend_node(self) -> list
             return a list of nodes with which the current node is connected 
         __eq__(self, other) -> Boolean
             Determines if two nodes are equal or not, checking their values
+        __hash__(self) -> int
+            Hash the node by its value, so equal nodes can be kept in sets and dicts
         __str__(self) -> str
             Prints the node data
+        __getstate__(self) -> dict
+            Return the attributes to pickle, without the weak references to the graphs
     """
 
+    graphs = ()
+
     def __init__(self, value, cordinates, neighbors=None):
         self.value = value
         self.x = cordinates[0]
@@ -78,6 +96,24 @@ class Node:
                 Represent the node with which a new connection is created
         """
         self.neighbors.append(neighboor)
+        for reference in self.graphs:
+            graph = reference()
+            if graph is not None:
+                graph.neighbor_added(self, neighboor[0])
+
+
+    def add_graph(self, graph):
+        """
+            Remember the graph, so it is told about the neighbors added later with add_neighboor.
+            Only a weak reference is kept, so the node does not keep the graph alive
+            Parameters
+            ----------
+            graph : Graph
+                A graph whose components know the node
+        """
+        reference = weakref.ref(graph)
+        if reference not in self.graphs:
+            self.graphs = self.graphs + (reference,)
     
 
     def extend_node(self):
@@ -130,6 +166,16 @@ class Node:
         return self.value == other
 
 
+    def __hash__(self):
+        """
+            Define the hash of the node as the hash of its value, in agreement with __eq__ 
+            Returns
+            -------
+                int
+        """
+        return hash(self.value)
+
+
     def __str__(self):
         """
             Define that a node is printed with its value. 
@@ -138,6 +184,19 @@ class Node:
                 str
         """
         return self.value
+
+
+    def __getstate__(self):
+        """
+            Return the attributes of the node to pickle. The weak references to the graphs can not
+            be pickled; an unpickled graph finds its nodes again when it rebuilds its components
+            Returns
+            -------
+                dict
+        """
+        state = self.__dict__.copy()
+        state.pop("graphs", None)
+        return state
         
 
 class Graph:
@@ -148,43 +207,136 @@ class Graph:
         ----------
         nodes : list
             List with all the nodes of the graph
+        index : dict
+            Maps the value of every node to the node itself, so lookups do not scan the list of nodes
+        observers : list
+            Functions called with the two nodes of every edge that is added or changes its weight.
+            Methods are kept as weak references, so an object that observes the graph is removed
+            when nothing else uses it
+        version : int
+            Incremented by every change of the graph (new node, new edge or new weight), so the
+            results calculated for an older version can be recognised
+        components : dict
+            Maps the value of every node to the value of another node of its connected component
+            (union-find). Following it up to a node that maps to itself gives the representative of
+            the component, so two nodes without a path between them are recognised at once
+        component_sizes : dict
+            Maps the representative of every component to its number of nodes
+        components_outdated : Boolean
+            True when an edge reaches a node the components do not know, so the components must
+            be calculated again before they are used
+        components_lock : RLock
+            Taken while the components are calculated again, so concurrent searches do not
+            calculate them more than once
         ...
         Methods
         -------
         add_node(self, node) -> None
-            Add a new node in the list of nodes
+            Add a new node in the list of nodes, unless a node with the same value already exists
         find_node(self, value) -> Node
             Find and return the node of the graph with the given value.   
+        has_node(self, value) -> Boolean
+            Check if a node with the given value exists in the graph
         add_edge(self, value1, value2, weight=1) -> None
             Add a new edge in the graph
+        update_edge(self, value1, value2, weight) -> None
+            Change the weight of an existing edge
+        add_observer(self, observer) -> None
+            Register a function that is told about every new or changed edge
+        remove_observer(self, observer) -> None
+            Stop telling a registered function about the edges
+        notify(self, node1, node2) -> None
+            Tell every observer that the edge between the two nodes was added or changed
+        find_root(components, value) -> str
+            Return the representative of a node in the given union-find dict
+        union(components, sizes, value1, value2) -> None
+            Join the components of two nodes in the given union-find dicts
+        find_component(self, value) -> str
+            Return the representative of the component of a node
+        join_components(self, value1, value2) -> None
+            Join the components of the two given nodes
+        neighbor_added(self, node, neighbor) -> None
+            Join the components of the two nodes of an edge added with Node.add_neighboor
+        components_complete(self) -> Boolean
+            Check if every edge of the graph is in the components
+        same_component(self, value1, value2) -> Boolean
+            Check if there can be a path between the two given nodes
+        rebuild_components(self) -> None
+            Calculate the components again from the neighbors of the nodes
         number_of_nodes(self) -> int
             Calculate and return the number of nodes of the graph
         are_connected(self, node_one, node_two) -> Boolean
             Check if the two given nodes are connected each other
+        freeze(self) -> FrozenGraph
+            Build a read-only, array-backed snapshot of the graph for the search algorithms
         __str__(self) -> str
             Prints the nodes of the graph
+        __getstate__(self) -> dict
+            Return the attributes to pickle, without the lock and the observers
+        __setstate__(self, state) -> None
+            Restore a pickled graph, whose components are calculated again before they are used
     """
     def __init__(self, nodes=None):
-        if nodes is None:
-            self.nodes = []
-        else:
-            self.nodes = nodes
+        self.nodes = []
+        self.index = {}
+        self.observers = []
+        self.version = 0
+        self.components = {}
+        self.component_sizes = {}
+        self.components_outdated = False
+        self.components_lock = threading.RLock()
+        if nodes is not None:
+            for node in nodes:
+                self.add_node(node)
 
 
     def add_node(self, node):
         """
-            Add a new node (vertex) in the grpah 
+            Add a new node (vertex) in the grpah. If a node with the same value
+            is already in the graph the new node is not inserted. The node is joined to the
+            components of the neighbors it already has
             Parameters
             ----------
                 node: Node
                     Represent the nserted node in the graph
         """
+        if node.value in self.index:
+            print(f"Error: A node with value {node.value} already exists")
+            return
         self.nodes.append(node)
+        self.index[node.value] = node
+        node.add_graph(self)
+        # the value is already there if the node was reached by rebuild_components from outside
+        if node.value not in self.components:
+            self.components[node.value] = node.value
+            self.component_sizes[node.value] = 1
+        for neighbor, _ in node.neighbors:
+            if neighbor.value in self.index:
+                self.join_components(node.value, neighbor.value)
+            else:
+                # the edges of the nodes outside the graph are only found by rebuild_components
+                self.components_outdated = True
+        self.version += 1
+
+
+    def has_node(self, value):
+        """
+            Return True if a node with the given value exists in the graph. Otherwise return False
+            Parameters
+            ----------
+                value: str
+                    Is the value of the node we want to find
+            ...
+            Return
+            ------
+                Boolean
+        """
+        return value in self.index
 
 
     def find_node(self, value):
         """
-            Return True if the node with the given value exist in the graph. Otherwise it return False
+            Return the node with the given value if it exists in the graph. Otherwise it return None
             Parameters
             ----------
                 value: str
@@ -194,10 +346,7 @@ class Graph:
             ------
                 Node
         """
-        for node in self.nodes:
-            if node.value == value:
-                return node 
-        return None
+        return self.index.get(value)
 
 
     def add_edge(self, value1, value2, weight=1):
@@ -222,10 +371,262 @@ class Graph:
         if (node1 is not None) and (node2 is not None):
             node1.add_neighboor((node2, weight))
             node2.add_neighboor((node1, weight))
+            self.join_components(node1.value, node2.value)
+            self.notify(node1, node2)
         else:
             print("Error: One or more nodes were not found")
 
 
+    def update_edge(self, value1, value2, weight):
+        """
+            Change the weight of the edge between the two given nodes, in both directions.
+            A weight of inf closes the edge
+            Parameters
+            ----------
+                value1: str
+                    The value of the first node
+                value2: str
+                    The value of the second node 
+                weight:
+                    The new weight of the edge
+        """
+        node1 = self.find_node(value1)        
+        node2 = self.find_node(value2)
+
+        if (node1 is None) or (node2 is None):
+            print("Error: One or more nodes were not found")
+            return
+        if not self.are_connected(value1, value2):
+            print(f"Error: There is no edge between {value1} and {value2}")
+            return
+
+        for node, other in ((node1, node2), (node2, node1)):
+            for i, neighboor in enumerate(node.neighbors):
+                if neighboor[0].value == other.value:
+                    node.neighbors[i] = (neighboor[0], weight)
+        self.notify(node1, node2)
+
+
+    def add_observer(self, observer):
+        """
+            Register a function that is called with the two nodes of every edge that is added
+            or whose weight changes, so incremental algorithms can repair their results
+            Parameters
+            ----------
+                observer: function
+                    Receives the two nodes of the edge. A method is kept as a weak reference, so
+                    the graph does not keep its object alive
+        """
+        if hasattr(observer, "__self__") and hasattr(observer, "__func__"):
+            observer = weakref.WeakMethod(observer)
+        self.observers.append(observer)
+
+
+    def remove_observer(self, observer):
+        """
+            Stop calling the given function when an edge is added or changed. Nothing happens if
+            it was not registered
+            Parameters
+            ----------
+                observer: function
+                    The function given to add_observer
+        """
+        for i, registered in enumerate(self.observers):
+            if isinstance(registered, weakref.WeakMethod):
+                registered = registered()
+            if registered == observer:
+                del self.observers[i]
+                return
+
+
+    def notify(self, node1, node2):
+        """
+            Increment the version of the graph and call every observer with the two nodes of an 
+            edge that was added or changed
+            Parameters
+            ----------
+                node1: Node
+                    The first node of the edge
+                node2: Node
+                    The second node of the edge
+        """
+        self.version += 1
+        for observer in list(self.observers):
+            if isinstance(observer, weakref.WeakMethod):
+                method = observer()
+                if method is None:
+                    # the object of the method was deleted
+                    self.observers.remove(observer)
+                    continue
+                method(node1, node2)
+            else:
+                observer(node1, node2)
+
+
+    @staticmethod
+    def find_root(components, value):
+        """
+            Return the value of the representative node of the given node in a union-find dict,
+            or None if the node is not in it. The dict is only read, so searches running at the
+            same time can call it
+            Parameters
+            ----------
+                components: dict
+                    Maps every node value to the value of another node of its component
+                value: str
+                    The value of the node
+            ...
+            Return
+            ------
+                str
+        """
+        parent = components.get(value)
+        if parent is None:
+            return None
+        while parent != value:
+            value, parent = parent, components[parent]
+        return value
+
+
+    @staticmethod
+    def union(components, sizes, value1, value2):
+        """
+            Join the components of the two given nodes in the union-find dicts, hanging the smaller
+            one from the bigger one, so the chains followed by find_root stay shorter than the
+            logarithm of the number of nodes
+            Parameters
+            ----------
+                components: dict
+                    Maps every node value to the value of another node of its component
+                sizes: dict
+                    Maps every representative to the number of nodes of its component
+                value1: str
+                    The value of the first node
+                value2: str
+                    The value of the second node
+        """
+        root1 = Graph.find_root(components, value1)
+        root2 = Graph.find_root(components, value2)
+        if root1 == root2:
+            return
+        if sizes[root1] < sizes[root2]:
+            root1, root2 = root2, root1
+        components[root2] = root1
+        sizes[root1] += sizes.pop(root2)
+
+
+    def find_component(self, value):
+        """
+            Return the value of the representative node of the component of the given node, or
+            None if the node is not in the graph
+            Parameters
+            ----------
+                value: str
+                    The value of the node
+            ...
+            Return
+            ------
+                str
+        """
+        return self.find_root(self.components, value)
+
+
+    def join_components(self, value1, value2):
+        """
+            Join the components of the two given nodes
+            Parameters
+            ----------
+                value1: str
+                    The value of the first node
+                value2: str
+                    The value of the second node
+        """
+        self.union(self.components, self.component_sizes, value1, value2)
+
+
+    def neighbor_added(self, node, neighbor):
+        """
+            Called by Node.add_neighboor for the nodes of the graph. The components of the two
+            nodes are joined, or marked outdated if the neighbor is unknown to them
+            Parameters
+            ----------
+                node: Node
+                    The node whose neighbors changed
+                neighbor: Node
+                    The new neighbor
+        """
+        if neighbor.value in self.components:
+            self.join_components(node.value, neighbor.value)
+        else:
+            self.components_outdated = True
+
+
+    def components_complete(self):
+        """
+            Return True if every edge of the graph is known by the components. Edges that reach
+            nodes outside the graph make it False until rebuild_components is called; so do the
+            edges added to the lists of neighbors directly, but those can not be noticed
+            ...
+            Return
+            ------
+                Boolean
+        """
+        return not self.components_outdated
+
+
+    def same_component(self, value1, value2):
+        """
+            Return True if the two given nodes are in the same component. Otherwise return False.
+            The components are calculated again first if they are not complete.
+            The components only grow: an edge closed by update_edge with a weight of inf still
+            joins them, so False means there is no path for sure, while True means there may be one
+            Parameters
+            ----------
+                value1: str
+                    The value of the first node
+                value2: str
+                    The value of the second node
+            ...
+            Return
+            ------
+                Boolean
+        """
+        if not self.components_complete():
+            with self.components_lock:
+                # another search may have calculated them while this one waited
+                if not self.components_complete():
+                    self.rebuild_components()
+        components = self.components
+        root1 = self.find_root(components, value1)
+        return root1 is not None and root1 == self.find_root(components, value2)
+
+
+    def rebuild_components(self):
+        """
+            Calculate the components again from the neighbors of every node. same_component calls
+            it when edges reach nodes outside the graph; it must be called by hand after changing
+            the lists of neighbors directly, which can not be noticed. The nodes outside the graph
+            reached by the edges are joined too, since a search can go through them, and they are
+            told to report their new neighbors. The new components are built aside and replace
+            the old ones at once, so the searches running meanwhile keep reading complete dicts
+        """
+        with self.components_lock:
+            components = {node.value: node.value for node in self.nodes}
+            sizes = dict.fromkeys(components, 1)
+            pending = list(self.nodes)
+            while pending:
+                node = pending.pop()
+                node.add_graph(self)
+                for neighbor, _ in node.neighbors:
+                    if neighbor.value not in components:
+                        components[neighbor.value] = neighbor.value
+                        sizes[neighbor.value] = 1
+                        pending.append(neighbor)
+                    self.union(components, sizes, node.value, neighbor.value)
+            self.components, self.component_sizes = components, sizes
+            self.components_outdated = False
+
+
     def number_of_nodes(self):
         """
             Return the number of nodes of the graph
@@ -253,6 +654,8 @@ class Graph:
         """
         node_one = self.find_node(node_one)
         node_two = self.find_node(node_two)
+        if (node_one is None) or (node_two is None):
+            return False
 
         for neighboor in node_one.neighbors:
             if neighboor[0].value == node_two.value:
@@ -260,6 +663,42 @@ class Graph:
         return False
 
 
+    def freeze(self):
+        """
+            Build a read-only snapshot of the graph in compressed sparse row (CSR) form.
+            The node with id i is self.nodes[i]; its edges are stored in
+            targets[offsets[i]:offsets[i+1]] and weights[offsets[i]:offsets[i+1]]
+            ...
+            Return
+            ------
+                FrozenGraph
+        """
+        ids = {node.value: i for i, node in enumerate(self.nodes)}
+        integer_weights = True
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = []
+        for node in self.nodes:
+            for neighbor, weight in node.neighbors:
+                neighbor_id = ids.get(neighbor.value)
+                if neighbor_id is None:
+                    continue
+                targets.append(neighbor_id)
+                weights.append(weight)
+                if not isinstance(weight, int):
+                    integer_weights = False
+            offsets.append(len(targets))
+
+        return FrozenGraph(
+            [node.value for node in self.nodes],
+            offsets,
+            targets,
+            array('q' if integer_weights else 'd', weights),
+            array('d', [node.x for node in self.nodes]),
+            array('d', [node.y for node in self.nodes]),
+        )
+
+
     def __str__(self):
         """
             Define the way the nodes of graph will be printed. 
@@ -271,5 +710,215 @@ class Graph:
         for node in self.nodes:
             graph += f"{node.__str__()}\n" 
         return graph
-    
-    
\ No newline at end of file
+
+
+    def __getstate__(self):
+        """
+            Return the attributes of the graph to pickle. The lock and the observers kept as weak
+            references can not be pickled, so they are left out
+            Return
+            ------
+                dict
+        """
+        state = self.__dict__.copy()
+        del state["components_lock"]
+        state["observers"] = [observer for observer in self.observers
+                              if not isinstance(observer, weakref.WeakMethod)]
+        return state
+
+
+    def __setstate__(self, state):
+        """
+            Restore a pickled graph. The unpickled nodes do not know the graph, so the components
+            are marked outdated: calculating them again tells the nodes to report their new edges
+            Parameters
+            ----------
+                state: dict
+                    The attributes returned by __getstate__
+        """
+        self.__dict__.update(state)
+        self.components_lock = threading.RLock()
+        self.components_outdated = True
+
+
+class FrozenGraph:
+    """ 
+        This class used to represent a read-only snapshot of a Graph in compressed sparse row (CSR) form.
+        Every node is identified by an integer id and all the data is kept in flat arrays, so the
+        search algorithms do not follow Node objects and tuples while they extend nodes
+        ...
+        Attributes
+        ----------
+        values : list
+            The value of every node, indexed by the node id. A snapshot built without values
+            uses a range, so every node is named by its own id
+        index : dict
+            Maps the value of every node to its id. It is None when the nodes are named by their ids
+        offsets : array
+            The edges of the node i are stored between offsets[i] and offsets[i+1]
+        targets : array
+            The id of the node at the other end of every edge
+        weights : array
+            The weight of every edge
+        x : array
+            The x-coordinate of every node
+        y : array
+            The y-coordinate of every node
+        ranks : array
+            The position of every node when the values are sorted. It is used to break ties
+            between nodes the same way Node.__gt__ does, without comparing the values
+        components : array
+            The label of the connected component of every node (the id of one of its nodes), so two
+            nodes without a path between them are recognised at once. The edges are followed in
+            both directions
+        version : int
+            Always 0, a snapshot never changes
+        ...
+        Methods
+        -------
+        find_id(self, value) -> int
+            Return the id of the node with the given value
+        number_of_nodes(self) -> int
+            Return the number of nodes of the graph
+        number_of_edges(self) -> int
+            Return the number of directed edges stored in the graph
+        edges_from(self, node_id) -> zip
+            Return the (id, weight) pairs of the edges that leave the given node
+        label_components(self) -> array
+            Calculate the label of the component of every node
+        same_component(self, node_id1, node_id2) -> Boolean
+            Check if there can be a path between the two given nodes
+    """
+    def __init__(self, values, offsets, targets, weights, x, y, ranks=None, components=None):
+        if values is None:
+            self.values = range(len(offsets) - 1)
+            self.index = None
+        else:
+            self.values = values
+            self.index = {value: i for i, value in enumerate(values)}
+        values = self.values
+        self.version = 0
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.x = x
+        self.y = y
+        if ranks is None and isinstance(values, range):
+            # nodes named by their ids are sorted by their ids
+            ranks = array('q', values)
+        if ranks is None:
+            ranks = array('q', bytes(8 * len(values)))
+            for rank, node_id in enumerate(sorted(range(len(values)), key=values.__getitem__)):
+                ranks[node_id] = rank
+        self.ranks = ranks
+        if components is None:
+            components = self.label_components()
+        self.components = components
+
+
+    def find_id(self, value):
+        """
+            Return the id of the node with the given value. If the value is not in the graph return None
+            Parameters
+            ----------
+                value: str
+                    Is the value of the node we want to find
+            ...
+            Return
+            ------
+                int
+        """
+        if self.index is None:
+            if isinstance(value, int) and 0 <= value < len(self.values):
+                return value
+            return None
+        return self.index.get(value)
+
+
+    def number_of_nodes(self):
+        """
+            Return the number of nodes of the graph
+            ...
+            Return
+            ------
+                int
+        """
+        return len(self.offsets) - 1
+
+
+    def number_of_edges(self):
+        """
+            Return the number of directed edges. Every undirected edge of the Graph is stored twice
+            ...
+            Return
+            ------
+                int
+        """
+        return len(self.targets)
+
+
+    def edges_from(self, node_id):
+        """
+            Return the (id, weight) pairs of the edges that leave the given node
+            Parameters
+            ----------
+                node_id: int
+                    The id of the node
+            ...
+            Return
+            ------
+                zip
+        """
+        begin = self.offsets[node_id]
+        end = self.offsets[node_id + 1]
+        return zip(self.targets[begin:end], self.weights[begin:end])
+
+
+    def label_components(self):
+        """
+            Calculate the label of the component of every node with a union-find over the edges,
+            so the edges stored in only one direction join their nodes too
+            ...
+            Return
+            ------
+                array
+        """
+        offsets, targets = self.offsets, self.targets
+        parents = array('q', range(len(offsets) - 1))
+        for node_id in range(len(offsets) - 1):
+            for edge in range(offsets[node_id], offsets[node_id + 1]):
+                # find the roots of both nodes, halving their paths
+                root1 = node_id
+                while parents[root1] != root1:
+                    parents[root1] = parents[parents[root1]]
+                    root1 = parents[root1]
+                root2 = targets[edge]
+                while parents[root2] != root2:
+                    parents[root2] = parents[parents[root2]]
+                    root2 = parents[root2]
+                if root1 != root2:
+                    # the smaller id becomes the root, so every label is the smallest id of its component
+                    if root1 < root2:
+                        parents[root2] = root1
+                    else:
+                        parents[root1] = root2
+        for node_id in range(len(parents)):
+            parents[node_id] = parents[parents[node_id]]
+        return parents
+
+
+    def same_component(self, node_id1, node_id2):
+        """
+            Return True if the two given nodes are in the same component. Otherwise return False
+            Parameters
+            ----------
+                node_id1: int
+                    The id of the first node
+                node_id2: int
+                    The id of the second node
+            ...
+            Return
+            ------
+                Boolean
+        """
+        return self.components[node_id1] == self.components[node_id2]
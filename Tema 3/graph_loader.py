@@ -0,0 +1,429 @@
+from array import array
+from math import inf
+import csv
+
+from graph import Graph, Node, FrozenGraph
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"GEL1"
+
+
+def ids_out_of_range(ids, number_of_nodes):
+    """
+        Return True if an id of the array is negative or not smaller than the number of nodes
+        Parameters
+        ----------
+            ids: array
+                The ids of nodes
+            number_of_nodes: int
+                The number of nodes of the graph
+        ...
+        Return
+        ------
+            Boolean
+    """
+    if not ids:
+        return False
+    if numpy is not None:
+        ids = numpy.frombuffer(ids, dtype=numpy.int64)
+        return bool(ids.min() < 0 or ids.max() >= number_of_nodes)
+    return min(ids) < 0 or max(ids) >= number_of_nodes
+
+
+def weights_invalid(weights):
+    """
+        Return True if a weight of the array is negative, infinite or not a number (nan). The
+        searches need finite weights of at least 0
+        Parameters
+        ----------
+            weights: array
+                The weights of the edges
+        ...
+        Return
+        ------
+            Boolean
+    """
+    if not weights:
+        return False
+    if numpy is not None:
+        weights = numpy.frombuffer(weights, dtype=numpy.int64 if weights.typecode == 'q' else numpy.float64)
+        return not bool(numpy.all(numpy.isfinite(weights) & (weights >= 0)))
+    return not all(0 <= weight < inf for weight in weights)
+
+
+class GraphLoader:
+    """
+        This class used to read big graphs from files straight into a FrozenGraph. The files are read
+        in chunks of rows and the edges are kept in flat arrays, so no Node object, tuple or
+        find_node call is needed per edge. Two formats are read:
+
+        CSV: a nodes file with "value,x,y" rows and an edges file with "source,target,weight" rows
+        (the weight is optional, 1 by default). A first row that is not numeric is a header
+
+        Binary: the magic b"GEL1", then the number of nodes, the number of edges and 1 if the
+        weights are floats (3 int64), the x and the y of every node (float64), and the sources,
+        the targets and the weights of the edges (int64, int64 and int64 or float64), with the
+        native byte order. The nodes are named by their ids
+        ...
+        Attributes
+        ----------
+        chunk_size : int
+            The number of rows (or edges) read at once
+        undirected : Boolean
+            If True, every edge is added in both directions, like Graph.add_edge does
+        strict : Boolean
+            If True, the first malformed row raises a ValueError. Otherwise the malformed rows are
+            skipped and kept in errors
+        errors : list
+            (line number, message) of every skipped row of the last file
+        ...
+        Methods
+        -------
+        load_csv(self, nodes_path, edges_path) -> FrozenGraph
+            Read the nodes and the edges from two CSV files
+        load_binary(self, path) -> FrozenGraph
+            Read a graph from a binary edge list file
+        read_nodes(self, path) -> list, array, array
+            Read the values and the coordinates of the nodes from a CSV file
+        read_edges(self, path, index) -> array, array, array
+            Read the edges from a CSV file
+        malformed(self, path, line_number, message, unit) -> None
+            Raise or keep the error of a malformed row
+        build(self, values, x, y, sources, targets, weights) -> FrozenGraph
+            Sort the edges by their source node and build the snapshot
+    """
+    def __init__(self, chunk_size=65536, undirected=True, strict=True):
+        self.chunk_size = chunk_size
+        self.undirected = undirected
+        self.strict = strict
+        self.errors = []
+
+
+    def malformed(self, path, line_number, message, unit="line"):
+        """
+            Raise a ValueError with the line number of a malformed row, or keep it in errors when
+            the loader is not strict
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+                line_number: int
+                    The line of the row (the index of the edge in a binary file)
+                message: str
+                    What is wrong with the row
+                unit: str
+                    "line" for a CSV file, "edge" for a binary file
+        """
+        if self.strict:
+            raise ValueError(f"{path}, {unit} {line_number}: {message}")
+        self.errors.append((line_number, message))
+
+
+    def read_nodes(self, path):
+        """
+            Read the "value,x,y" rows of a CSV file
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+            ...
+            Return
+            ------
+                list, array, array
+                    The values and the x and y coordinates of the nodes
+        """
+        values = []
+        xs = array('d')
+        ys = array('d')
+        index = set()
+        with open(path, newline='') as file:
+            reader = csv.reader(file)
+            while True:
+                chunk_x = []
+                chunk_y = []
+                for row in reader:
+                    line_number = reader.line_num
+                    if not row:
+                        continue
+                    if len(row) != 3:
+                        self.malformed(path, line_number, f"expected value,x,y but found {len(row)} fields")
+                        continue
+                    value = row[0].strip()
+                    try:
+                        x = float(row[1])
+                        y = float(row[2])
+                    except ValueError:
+                        if line_number != 1:
+                            self.malformed(path, line_number, f"the coordinates {row[1]},{row[2]} are not numbers")
+                        continue
+                    if value in index:
+                        self.malformed(path, line_number, f"a node with value {value} already exists")
+                        continue
+                    index.add(value)
+                    values.append(value)
+                    chunk_x.append(x)
+                    chunk_y.append(y)
+                    if len(chunk_x) == self.chunk_size:
+                        break
+                if not chunk_x:
+                    break
+                xs.extend(chunk_x)
+                ys.extend(chunk_y)
+        return values, xs, ys
+
+
+    def read_edges(self, path, index):
+        """
+            Read the "source,target,weight" rows of a CSV file. The weights are integers until a
+            row with a decimal weight is found. A negative, infinite or nan weight is malformed
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+                index: dict
+                    Maps the value of every node to its id
+            ...
+            Return
+            ------
+                array, array, array
+                    The id of the source and of the target of every edge, and its weight
+        """
+        sources = array('q')
+        targets = array('q')
+        weights = array('q')
+        with open(path, newline='') as file:
+            reader = csv.reader(file)
+            while True:
+                chunk_sources = []
+                chunk_targets = []
+                chunk_weights = []
+                float_weights = False
+                for row in reader:
+                    line_number = reader.line_num
+                    if not row:
+                        continue
+                    if not 2 <= len(row) <= 3:
+                        self.malformed(path, line_number, f"expected source,target,weight but found {len(row)} fields")
+                        continue
+                    source = index.get(row[0].strip())
+                    target = index.get(row[1].strip())
+                    weight = row[2] if len(row) == 3 else "1"
+                    try:
+                        weight = int(weight)
+                    except ValueError:
+                        try:
+                            weight = float(weight)
+                        except ValueError:
+                            if line_number != 1:
+                                self.malformed(path, line_number, f"the weight {weight} is not a number")
+                            continue
+                    # nan is not between the limits either
+                    if not 0 <= weight < inf:
+                        self.malformed(path, line_number, f"the weight {row[2].strip()} is not a finite number of at least 0")
+                        continue
+                    if isinstance(weight, float):
+                        float_weights = True
+                    if source is None or target is None:
+                        # a first row with unknown nodes is a header
+                        if line_number != 1:
+                            missing = row[0] if source is None else row[1]
+                            self.malformed(path, line_number, f"the node {missing.strip()} was not found")
+                        continue
+                    chunk_sources.append(source)
+                    chunk_targets.append(target)
+                    chunk_weights.append(weight)
+                    if len(chunk_sources) == self.chunk_size:
+                        break
+                if not chunk_sources:
+                    break
+                sources.extend(chunk_sources)
+                targets.extend(chunk_targets)
+                if float_weights and weights.typecode == 'q':
+                    weights = array('d', weights)
+                weights.extend(chunk_weights)
+        return sources, targets, weights
+
+
+    def load_csv(self, nodes_path, edges_path):
+        """
+            Read the nodes and the edges of a graph from two CSV files
+            Parameters
+            ----------
+                nodes_path: str
+                    The path of the "value,x,y" file
+                edges_path: str
+                    The path of the "source,target,weight" file
+            ...
+            Return
+            ------
+                FrozenGraph
+        """
+        self.errors = []
+        values, xs, ys = self.read_nodes(nodes_path)
+        index = {value: i for i, value in enumerate(values)}
+        sources, targets, weights = self.read_edges(edges_path, index)
+        return self.build(values, xs, ys, sources, targets, weights)
+
+
+    def load_binary(self, path):
+        """
+            Read a graph from a binary edge list file, written by save_binary. The arrays are read
+            in chunks directly from the file. The edges with an unknown node or with a negative,
+            infinite or nan weight are malformed
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+            ...
+            Return
+            ------
+                FrozenGraph
+        """
+        self.errors = []
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a binary edge list")
+            header = array('q')
+            try:
+                header.fromfile(file, 3)
+            except EOFError:
+                raise ValueError(f"{path} has an incomplete header")
+            number_of_nodes, number_of_edges, float_weights = header
+
+            columns = [array('d'), array('d'), array('q'), array('q'), array('d' if float_weights else 'q')]
+            lengths = [number_of_nodes, number_of_nodes, number_of_edges, number_of_edges, number_of_edges]
+            for column, length in zip(columns, lengths):
+                while len(column) < length:
+                    try:
+                        column.fromfile(file, min(self.chunk_size, length - len(column)))
+                    except EOFError:
+                        raise ValueError(f"{path} is shorter than its header says")
+        xs, ys, sources, targets, weights = columns
+
+        if (ids_out_of_range(sources, number_of_nodes) or ids_out_of_range(targets, number_of_nodes)
+                or weights_invalid(weights)):
+            keep = []
+            for edge in range(number_of_edges):
+                if not (0 <= sources[edge] < number_of_nodes and 0 <= targets[edge] < number_of_nodes):
+                    self.malformed(path, edge, f"the edge {sources[edge]} - {targets[edge]} has an unknown node", "edge")
+                elif not 0 <= weights[edge] < inf:
+                    self.malformed(path, edge, f"the edge {sources[edge]} - {targets[edge]} has the weight {weights[edge]}", "edge")
+                else:
+                    keep.append(edge)
+            sources = array('q', [sources[edge] for edge in keep])
+            targets = array('q', [targets[edge] for edge in keep])
+            weights = array(weights.typecode, [weights[edge] for edge in keep])
+        return self.build(None, xs, ys, sources, targets, weights)
+
+
+    def build(self, values, x, y, sources, targets, weights):
+        """
+            Sort the edges by their source node (a counting sort, with NumPy when it is installed)
+            and build the FrozenGraph
+            Parameters
+            ----------
+                values: list
+                    The value of every node, or None to name the nodes by their ids
+                x: array
+                    The x-coordinate of every node
+                y: array
+                    The y-coordinate of every node
+                sources: array
+                    The id of the source node of every edge
+                targets: array
+                    The id of the target node of every edge
+                weights: array
+                    The weight of every edge
+            ...
+            Return
+            ------
+                FrozenGraph
+        """
+        number_of_nodes = len(x)
+        if self.undirected:
+            sources, targets = sources + targets, targets + sources
+            weights = weights + weights
+
+        if numpy is not None:
+            source_ids = numpy.frombuffer(sources, dtype=numpy.int64)
+            # the order of the edges of a node does not matter, so the faster unstable sort is used
+            order = numpy.argsort(source_ids)
+            counts = numpy.bincount(source_ids, minlength=number_of_nodes)
+            offsets = array('q', [0])
+            offsets.frombytes(numpy.cumsum(counts, dtype=numpy.int64).tobytes())
+            sorted_targets = array('q', numpy.frombuffer(targets, dtype=numpy.int64)[order].tobytes())
+            weight_type = numpy.int64 if weights.typecode == 'q' else numpy.float64
+            sorted_weights = array(weights.typecode, numpy.frombuffer(weights, dtype=weight_type)[order].tobytes())
+            return FrozenGraph(values, offsets, sorted_targets, sorted_weights, x, y)
+
+        offsets = array('q', bytes(8 * (number_of_nodes + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for node_id in range(number_of_nodes):
+            offsets[node_id + 1] += offsets[node_id]
+        positions = array('q', offsets)
+        sorted_targets = array('q', bytes(8 * len(targets)))
+        sorted_weights = array(weights.typecode, bytes(weights.itemsize * len(weights)))
+        for source, target, weight in zip(sources, targets, weights):
+            position = positions[source]
+            sorted_targets[position] = target
+            sorted_weights[position] = weight
+            positions[source] = position + 1
+        return FrozenGraph(values, offsets, sorted_targets, sorted_weights, x, y)
+
+
+def save_binary(graph, path):
+    """
+        Write every directed edge of a FrozenGraph in a binary edge list file. The values of the
+        nodes are not written, the nodes are named by their ids. Read it with
+        GraphLoader(undirected=False).load_binary
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot of the graph
+            path: str
+                The path of the file
+    """
+    number_of_nodes = graph.number_of_nodes()
+    sources = array('q')
+    for node_id in range(number_of_nodes):
+        sources.extend(array('q', [node_id]) * (graph.offsets[node_id + 1] - graph.offsets[node_id]))
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        array('q', [number_of_nodes, graph.number_of_edges(), memoryview(graph.weights).format == 'd']).tofile(file)
+        array('d', graph.x).tofile(file)
+        array('d', graph.y).tofile(file)
+        sources.tofile(file)
+        array('q', graph.targets).tofile(file)
+        file.write(memoryview(graph.weights).cast("B"))
+
+
+def build_graph(graph):
+    """
+        Build a Graph with Node objects from a FrozenGraph, for the code that needs Node objects.
+        The nodes and their neighbors are added directly, without add_edge, so there is no lookup
+        and no observer call per edge
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot of the graph
+        ...
+        Return
+        ------
+            Graph
+    """
+    result = Graph()
+    nodes = [Node(value, (x, y)) for value, x, y in zip(graph.values, graph.x, graph.y)]
+    result.nodes = nodes
+    result.index = {node.value: node for node in nodes}
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    for node_id, node in enumerate(nodes):
+        begin, end = offsets[node_id], offsets[node_id + 1]
+        node.neighbors = [(nodes[target], weight) for target, weight in zip(targets[begin:end], weights[begin:end])]
+    result.rebuild_components()
+    result.version += 1
+    return result
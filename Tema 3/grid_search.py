@@ -0,0 +1,501 @@
+from math import inf, sqrt
+import heapq
+
+from a_star import NoPath
+
+# the cost of a diagonal move; a move along an axis costs 1
+DIAGONAL_COST = sqrt(2)
+
+# the characters of a free cell in a text map (MovingAI maps also use G and S)
+FREE_CHARACTERS = ".GS"
+
+
+class Grid:
+    """
+        This class used to represent an occupancy grid: one byte per cell, 0 for a free cell and
+        1 for a blocked one, stored row after row. A cell is given by its (x, y) coordinates,
+        x being the column and y the row, like Node.x and Node.y
+        ...
+        Attributes
+        ----------
+        width : int
+            The number of columns
+        height : int
+            The number of rows
+        cells : bytearray
+            The cells row after row, the cell (x, y) is at y * width + x
+        ...
+        Methods
+        -------
+        from_rows(rows) -> Grid
+            Build a grid from rows of characters
+        load(path) -> Grid
+            Read a grid from a text map or a PBM bitmap
+        parse_bitmap(data) -> Grid
+            Build a grid from the bytes of a PBM bitmap
+        is_free(self, x, y) -> Boolean
+            Check if a cell is inside the grid and not blocked
+        neighbors(self, x, y, diagonal) -> list
+            Return the free cells next to a cell and the cost of moving to them
+    """
+    def __init__(self, width, height, cells=None):
+        if cells is None:
+            cells = bytearray(width * height)
+        if len(cells) != width * height:
+            raise ValueError(f"A {width}x{height} grid needs {width * height} cells, not {len(cells)}")
+        self.width = width
+        self.height = height
+        self.cells = cells
+
+
+    @staticmethod
+    def from_rows(rows):
+        """
+            Build a grid from rows of characters, '.' (or 'G', 'S') for a free cell and any other
+            character ('@', '#', 'T', ...) for a blocked one
+            Parameters
+            ----------
+                rows: list
+                    The rows of the grid, from y = 0
+            ...
+            Return
+            ------
+                Grid
+        """
+        if not rows:
+            raise ValueError("The grid has no rows")
+        width = len(rows[0])
+        cells = bytearray()
+        for number, row in enumerate(rows, start=1):
+            if len(row) != width:
+                raise ValueError(f"Row {number} has {len(row)} cells, expected {width}")
+            cells.extend(0 if character in FREE_CHARACTERS else 1 for character in row)
+        return Grid(width, len(rows), cells)
+
+
+    @staticmethod
+    def load(path):
+        """
+            Read a grid from a file: a PBM bitmap (P1 or P4, a black pixel is a blocked cell) or a
+            text map with one row per line. The header of the MovingAI maps ("type", "height",
+            "width", "map") is skipped
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+            ...
+            Return
+            ------
+                Grid
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if data[:2] in (b"P1", b"P4"):
+            return Grid.parse_bitmap(data)
+
+        rows = data.decode('ascii').splitlines()
+        if rows and rows[0].startswith("type"):
+            rows = rows[rows.index("map") + 1:]
+        return Grid.from_rows([row for row in rows if row])
+
+
+    @staticmethod
+    def parse_bitmap(data):
+        """
+            Build a grid from the bytes of a PBM file
+            Parameters
+            ----------
+                data: bytes
+                    The content of the file
+            ...
+            Return
+            ------
+                Grid
+        """
+        # the header is the magic number, the width and the height, comments start with '#'
+        fields = []
+        position = 0
+        while len(fields) < 3:
+            while position < len(data) and data[position:position + 1].isspace():
+                position += 1
+            if data[position:position + 1] == b"#":
+                position = data.find(b"\n", position) + 1 or len(data)
+                continue
+            end = position
+            while end < len(data) and not data[end:end + 1].isspace():
+                end += 1
+            if end == position:
+                raise ValueError("The PBM header is incomplete")
+            fields.append(data[position:end])
+            position = end
+        magic, width, height = fields[0], int(fields[1]), int(fields[2])
+
+        if magic == b"P1":
+            bits = [int(character) for character in data[position:].decode('ascii') if character in "01"]
+            if len(bits) < width * height:
+                raise ValueError(f"The bitmap has {len(bits)} pixels, expected {width * height}")
+            return Grid(width, height, bytearray(bits[:width * height]))
+
+        # P4: one whitespace after the header, then every row padded to a whole byte
+        position += 1
+        row_bytes = (width + 7) // 8
+        if len(data) - position < row_bytes * height:
+            raise ValueError("The bitmap is shorter than its header says")
+        cells = bytearray(width * height)
+        for y in range(height):
+            row = data[position + y * row_bytes:position + (y + 1) * row_bytes]
+            for x in range(width):
+                cells[y * width + x] = (row[x >> 3] >> (7 - (x & 7))) & 1
+        return Grid(width, height, cells)
+
+
+    def is_free(self, x, y):
+        """
+            Return True if the cell is inside the grid and not blocked
+            Parameters
+            ----------
+                x: int
+                    The column of the cell
+                y: int
+                    The row of the cell
+            ...
+            Return
+            ------
+                Boolean
+        """
+        return 0 <= x < self.width and 0 <= y < self.height and not self.cells[y * self.width + x]
+
+
+    def neighbors(self, x, y, diagonal=True):
+        """
+            Return the free cells next to the given cell and the cost of moving to them. A diagonal
+            move is allowed only when both cells along the axes are free, so a path never cuts
+            the corner of a blocked cell
+            Parameters
+            ----------
+                x: int
+                    The column of the cell
+                y: int
+                    The row of the cell
+                diagonal: Boolean
+                    If True, the 8 cells around are used, otherwise only the 4 along the axes
+            ...
+            Return
+            ------
+                list
+                    (x, y, cost) tuples
+        """
+        is_free = self.is_free
+        result = []
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            if is_free(x + dx, y + dy):
+                result.append((x + dx, y + dy, 1))
+        if diagonal:
+            for dx, dy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                if is_free(x + dx, y + dy) and is_free(x + dx, y) and is_free(x, y + dy):
+                    result.append((x + dx, y + dy, DIAGONAL_COST))
+        return result
+
+
+def sign(number):
+    """
+        Return -1, 0 or 1, the sign of the number
+    """
+    return (number > 0) - (number < 0)
+
+
+class GridSearch:
+    """
+        This class used to find the shortest path between two cells of a Grid without building a
+        Graph. On 8-connected grids it runs Jump Point Search: instead of adding every free neighbor
+        to the opened list, it jumps along straight and diagonal lines and only stops at the cells
+        where a shorter path could turn (jump points). On 4-connected grids, or when jump_points
+        is False, it runs plain A* on the cells
+        ...
+        Attributes
+        ----------
+        grid : Grid
+            Represent the grid (search space of the problem)
+        start : tuple
+            The (x, y) of the starting cell
+        target : tuple
+            The (x, y) of the destination cell
+        diagonal : Boolean
+            If True, the diagonal moves are allowed
+        jump_points : Boolean
+            If True (and diagonal), Jump Point Search is used
+        blocked : bytearray
+            The cells with a border of blocked cells around the grid, so the jumps do not check
+            the limits of the grid; the cell (x, y) is at (y + 1) * stride + x + 1
+        stride : int
+            The length of a row of the bordered grid, width + 2
+        target_index : int
+            The index of the target cell in the bordered grid
+        number_of_steps : int
+            Keep the number of steps of the algorithm
+        ...
+        Methods
+        -------
+        estimate(self, x, y) -> float
+            Return the octile (or manhattan) distance from a cell to the target
+        successors(self, x, y, parent) -> list
+            Return the cells reached from a cell and the cost of moving to them
+        bordered_cells(self) -> bytearray
+            Return the cells of the grid surrounded by a border of blocked cells
+        jump(self, index, dx, dy) -> int
+            Move from a cell in one direction until a jump point is found
+        pruned_directions(self, x, y, parent) -> list
+            Return the directions Jump Point Search continues in from a cell
+        calculate_path(self, parents) -> list
+            Return every cell of the path from the start to the target
+        search(self) -> list, float
+            Return the shortest path from the start cell to the target cell and its cost
+    """
+    def __init__(self, grid, start_position, target, diagonal=True, jump_points=True):
+        self.grid = grid
+        self.start = tuple(start_position)
+        self.target = tuple(target)
+        self.diagonal = diagonal
+        self.jump_points = jump_points and diagonal
+        self.stride = grid.width + 2
+        self.blocked = self.bordered_cells() if self.jump_points else None
+        self.target_index = (self.target[1] + 1) * self.stride + self.target[0] + 1
+        self.number_of_steps = 0
+
+
+    def bordered_cells(self):
+        """
+            Return a copy of the cells of the grid with a border of blocked cells around it
+            ...
+            Return
+            ------
+                bytearray
+        """
+        width = self.grid.width
+        blocked = bytearray(b"\x01") * (self.stride * (self.grid.height + 2))
+        for y in range(self.grid.height):
+            begin = (y + 1) * self.stride + 1
+            blocked[begin:begin + width] = self.grid.cells[y * width:(y + 1) * width]
+        return blocked
+
+
+    def estimate(self, x, y):
+        """
+            Return the octile distance from the cell to the target cell, or the manhattan distance
+            when the diagonal moves are not allowed
+            ...
+            Return
+            ------
+                float
+        """
+        dx = abs(x - self.target[0])
+        dy = abs(y - self.target[1])
+        if not self.diagonal:
+            return dx + dy
+        return max(dx, dy) + (DIAGONAL_COST - 1) * min(dx, dy)
+
+
+    def jump(self, index, dx, dy):
+        """
+            Move from a cell in the direction (dx, dy) and return the first jump point: the
+            target, a cell with a forced neighbor (a neighbor that can only be reached with a
+            shortest path through this cell), or, on a diagonal, a cell from which a straight
+            jump finds a jump point
+            Parameters
+            ----------
+                index: int
+                    The index of the first cell in the bordered grid
+                dx: int
+                    The direction along x, -1, 0 or 1
+                dy: int
+                    The direction along y, -1, 0 or 1
+            ...
+            Return
+            ------
+                int
+                    The index of the jump point in the bordered grid, or None
+        """
+        blocked = self.blocked
+        stride = self.stride
+        target = self.target_index
+        step = dx + dy * stride
+        while not blocked[index]:
+            if index == target:
+                return index
+            if dx and dy:
+                if self.jump(index + dx, dx, 0) is not None or \
+                        self.jump(index + dy * stride, 0, dy) is not None:
+                    return index
+                # a diagonal move needs both cells along the axes
+                if blocked[index + dx] or blocked[index + dy * stride]:
+                    return None
+            elif dx:
+                if (not blocked[index - stride] and blocked[index - stride - dx]) or \
+                        (not blocked[index + stride] and blocked[index + stride - dx]):
+                    return index
+            elif (not blocked[index - 1] and blocked[index - 1 - step]) or \
+                    (not blocked[index + 1] and blocked[index + 1 - step]):
+                return index
+            index += step
+        return None
+
+
+    def pruned_directions(self, x, y, parent):
+        """
+            Return the directions Jump Point Search continues in from the cell, given the cell it
+            was reached from. Without a parent (the start cell) every direction is used
+            Parameters
+            ----------
+                x: int
+                    The column of the cell
+                y: int
+                    The row of the cell
+                parent: tuple
+                    The (x, y) of the previous jump point, or None
+            ...
+            Return
+            ------
+                list
+                    (dx, dy) tuples
+        """
+        if parent is None:
+            return [(nx - x, ny - y) for nx, ny, _ in self.grid.neighbors(x, y)]
+        is_free = self.grid.is_free
+        dx = sign(x - parent[0])
+        dy = sign(y - parent[1])
+        directions = []
+        if dx and dy:
+            if is_free(x, y + dy):
+                directions.append((0, dy))
+            if is_free(x + dx, y):
+                directions.append((dx, 0))
+            if is_free(x, y + dy) and is_free(x + dx, y):
+                directions.append((dx, dy))
+        elif dx:
+            up, down = is_free(x, y + 1), is_free(x, y - 1)
+            if is_free(x + dx, y):
+                directions.append((dx, 0))
+                if up:
+                    directions.append((dx, 1))
+                if down:
+                    directions.append((dx, -1))
+            if up:
+                directions.append((0, 1))
+            if down:
+                directions.append((0, -1))
+        else:
+            right, left = is_free(x + 1, y), is_free(x - 1, y)
+            if is_free(x, y + dy):
+                directions.append((0, dy))
+                if right:
+                    directions.append((1, dy))
+                if left:
+                    directions.append((-1, dy))
+            if right:
+                directions.append((1, 0))
+            if left:
+                directions.append((-1, 0))
+        return directions
+
+
+    def successors(self, x, y, parent):
+        """
+            Return the cells reached from the given cell and the cost of moving to them: the jump
+            points for Jump Point Search, the free neighbors for plain A*
+            Parameters
+            ----------
+                x: int
+                    The column of the cell
+                y: int
+                    The row of the cell
+                parent: tuple
+                    The (x, y) of the cell it was reached from, or None
+            ...
+            Return
+            ------
+                list
+                    (x, y, cost) tuples
+        """
+        if not self.jump_points:
+            return self.grid.neighbors(x, y, self.diagonal)
+        result = []
+        stride = self.stride
+        index = (y + 1) * stride + x + 1
+        for dx, dy in self.pruned_directions(x, y, parent):
+            point = self.jump(index + dx + dy * stride, dx, dy)
+            if point is not None:
+                point_y, point_x = divmod(point, stride)
+                point_x -= 1
+                point_y -= 1
+                # a jump is a straight or a diagonal line
+                steps = max(abs(point_x - x), abs(point_y - y))
+                result.append((point_x, point_y, steps * (DIAGONAL_COST if dx and dy else 1)))
+        return result
+
+
+    def calculate_path(self, parents):
+        """
+            Return every cell of the path from the start cell to the target cell, filling in the
+            cells between two jump points
+            Parameters
+            ----------
+                parents: dict
+                    Maps every reached cell to the cell it was reached from
+            ...
+            Return
+            ------
+                list
+                    (x, y) tuples
+        """
+        path = [self.target]
+        cell = self.target
+        while parents[cell] is not None:
+            parent = parents[cell]
+            dx = sign(parent[0] - cell[0])
+            dy = sign(parent[1] - cell[1])
+            x, y = cell
+            while (x, y) != parent:
+                x += dx
+                y += dy
+                path.append((x, y))
+            cell = parent
+        path.reverse()
+        return path
+
+
+    def search(self):
+        """
+            Return the shortest path from the start cell to the target cell and its cost, like
+            AStar.search. The path is a list of (x, y) cells
+            ...
+            Return
+            ------
+                list, float
+                    The path and its cost, or a NoPath if the target can not be reached or one
+                    of the two cells is blocked or outside the grid
+        """
+        if not self.grid.is_free(*self.start) or not self.grid.is_free(*self.target):
+            return NoPath(self.start, self.target, NoPath.BLOCKED)
+
+        self.number_of_steps = 0
+        distances = {self.start: 0}
+        parents = {self.start: None}
+        closed = set()
+        opened = [(self.estimate(*self.start), self.start)]
+        while opened:
+            _, cell = heapq.heappop(opened)
+            if cell in closed:
+                continue
+            if cell == self.target:
+                return self.calculate_path(parents), distances[cell]
+            closed.add(cell)
+            self.number_of_steps += 1
+
+            distance = distances[cell]
+            for x, y, cost in self.successors(cell[0], cell[1], parents[cell]):
+                new_distance = distance + cost
+                if new_distance < distances.get((x, y), inf):
+                    distances[(x, y)] = new_distance
+                    parents[(x, y)] = cell
+                    heapq.heappush(opened, (new_distance + self.estimate(x, y), (x, y)))
+        return NoPath(self.start, self.target, NoPath.EXHAUSTED, self.number_of_steps)
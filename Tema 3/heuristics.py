@@ -0,0 +1,148 @@
+from math import sqrt
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# sqrt(2) - 1, the extra cost of a diagonal step in the octile distance
+DIAGONAL_EXTRA = sqrt(2) - 1
+
+
+def manhattan(node1, node2):
+    """
+        Return the manhattan distance between the two given nodes, for moves along the axes
+    """
+    return abs(node1.x - node2.x) + abs(node1.y - node2.y)
+
+
+def euclidean(node1, node2):
+    """
+        Return the straight-line distance between the two given nodes
+    """
+    return sqrt((node1.x - node2.x) ** 2 + (node1.y - node2.y) ** 2)
+
+
+def octile(node1, node2):
+    """
+        Return the octile distance between the two given nodes, for moves along the axes and
+        the diagonals of a grid
+    """
+    dx = abs(node1.x - node2.x)
+    dy = abs(node1.y - node2.y)
+    return max(dx, dy) + DIAGONAL_EXTRA * min(dx, dy)
+
+
+def zero(node1, node2):
+    """
+        Return 0. With this heuristic A* works like Dijkstra's algorithm
+    """
+    return 0
+
+
+HEURISTICS = {
+    "manhattan": manhattan,
+    "euclidean": euclidean,
+    "octile": octile,
+    "zero": zero,
+    "dijkstra": zero,
+}
+
+
+def get_heuristic(heuristic):
+    """
+        Return the heuristic function with the given name. A function is returned unchanged
+        ...
+        Parameters
+        ----------
+            heuristic: str or function
+                One of the names of HEURISTICS, or a function of two nodes
+        Return
+        ------
+            function
+    """
+    if callable(heuristic):
+        return heuristic
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic {heuristic}, use one of {', '.join(HEURISTICS)}")
+    return HEURISTICS[heuristic]
+
+
+def heuristic_of_ids(graph, name):
+    """
+        Return the heuristic with the given name as a function of two node ids of a FrozenGraph,
+        calculated from the coordinates of its arrays
+        ...
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot of the graph
+            name: str
+                One of the names of HEURISTICS
+        Return
+        ------
+            function
+    """
+    function = get_heuristic(name)
+    xs, ys = graph.x, graph.y
+    if function is zero:
+        return lambda node_id1, node_id2: 0
+    if function is manhattan:
+        return lambda node_id1, node_id2: abs(xs[node_id1] - xs[node_id2]) + abs(ys[node_id1] - ys[node_id2])
+    if function is euclidean:
+        return lambda node_id1, node_id2: sqrt((xs[node_id1] - xs[node_id2]) ** 2 + (ys[node_id1] - ys[node_id2]) ** 2)
+
+    def octile_of_ids(node_id1, node_id2):
+        dx = abs(xs[node_id1] - xs[node_id2])
+        dy = abs(ys[node_id1] - ys[node_id2])
+        return max(dx, dy) + DIAGONAL_EXTRA * min(dx, dy)
+    return octile_of_ids
+
+
+def estimates_to(graph, target_id, name):
+    """
+        Calculate the heuristic value of every node of a FrozenGraph for the given target at once.
+        NumPy is used when it is installed; otherwise the values are calculated in a list
+        ...
+        Parameters
+        ----------
+            graph: FrozenGraph
+                The snapshot of the graph
+            target_id: int
+                The id of the target node
+            name: str
+                One of the names of HEURISTICS
+        Return
+        ------
+            list
+                The estimated distance from every node to the target, indexed by node id
+    """
+    get_heuristic(name)
+    number_of_nodes = graph.number_of_nodes()
+    if HEURISTICS[name] is zero:
+        return [0] * number_of_nodes
+    target_x = graph.x[target_id]
+    target_y = graph.y[target_id]
+
+    if numpy is not None:
+        dx = numpy.abs(numpy.asarray(graph.x, dtype=numpy.float64) - target_x)
+        dy = numpy.abs(numpy.asarray(graph.y, dtype=numpy.float64) - target_y)
+        if HEURISTICS[name] is manhattan:
+            values = dx + dy
+        elif HEURISTICS[name] is euclidean:
+            values = numpy.hypot(dx, dy)
+        else:
+            values = numpy.maximum(dx, dy) + DIAGONAL_EXTRA * numpy.minimum(dx, dy)
+        return values.tolist()
+
+    xs, ys = graph.x, graph.y
+    if HEURISTICS[name] is manhattan:
+        return [abs(x - target_x) + abs(y - target_y) for x, y in zip(xs, ys)]
+    if HEURISTICS[name] is euclidean:
+        return [sqrt((x - target_x) ** 2 + (y - target_y) ** 2) for x, y in zip(xs, ys)]
+    values = []
+    for x, y in zip(xs, ys):
+        dx = abs(x - target_x)
+        dy = abs(y - target_y)
+        values.append(max(dx, dy) + DIAGONAL_EXTRA * min(dx, dy))
+    return values
@@ -0,0 +1,144 @@
+from math import inf
+
+from heuristics import get_heuristic
+from a_star import NoPath
+
+
+class IDAStar:
+    """
+        This class used to represent the Iterative Deepening A* algorithm (IDA*), a memory-bounded
+        alternative to AStar. Every iteration is a depth-first search that stops at the nodes whose
+        distance plus estimate is bigger than a bound; the next iteration uses the smallest value
+        that went over the bound. Only the current path is kept, plus a table with the best known
+        distance of at most max_nodes nodes, so the memory does not grow with the graph. The price
+        is time: the nodes are extended again in every iteration, and a smaller table extends the
+        same node again for every path that reaches it
+        ...
+        Attributes
+        ----------
+        graph : Graph
+            Represent the graph (search space of the problem)
+        start : Node
+            Represent the starting point
+        target : Node
+            Represent the destination (target) node
+        max_nodes : int
+            The maximum number of nodes kept in the table of best distances
+        heuristic : function
+            Estimate the distance between two nodes, like the heuristic of AStar
+        best_distances : dict
+            The smallest distance from the start of the nodes reached in the current iteration;
+            a node reached again with a distance not smaller is not extended again
+        number_of_iterations : int
+            Keep the number of depth-first searches
+        number_of_steps : int
+            Keep the number of steps of the algorithm
+        ...
+        Methods
+        -------
+        depth_first(self, bound) -> list, int, float
+            Search the nodes whose distance plus estimate is not bigger than the bound
+        search(self) -> list, int
+            Return the shortest path from the start node to the target node and its cost
+    """
+    def __init__(self, graph, start_position, target, max_nodes=100000, heuristic="manhattan"):
+        self.graph = graph
+        self.start = graph.find_node(start_position)
+        self.target = graph.find_node(target)
+        self.max_nodes = max_nodes
+        self.heuristic = get_heuristic(heuristic)
+        self.best_distances = {}
+        self.number_of_iterations = 0
+        self.number_of_steps = 0
+
+
+    def depth_first(self, bound):
+        """
+            Depth-first search from the start node that does not extend the nodes whose distance
+            plus estimate is bigger than the bound. The search uses a stack instead of recursion,
+            so long paths do not reach the recursion limit of Python
+            Parameters
+            ----------
+                bound : float
+                    The biggest distance plus estimate a node may have to be extended
+            ...
+            Return
+            ------
+                list, int, float
+                    The path and its cost if the target was found (None, None otherwise) and the
+                    bound of the next iteration (inf if no node went over the bound)
+        """
+        heuristic = self.heuristic
+        target = self.target
+        best_distances = self.best_distances
+        best_distances.clear()
+        best_distances[self.start.value] = 0
+        path = [self.start]
+        distances = [0]
+        on_path = {self.start.value}
+        stack = [iter(self.start.neighbors)]
+        next_bound = inf
+
+        while stack:
+            distance = distances[-1]
+            for neighbor, weight in stack[-1]:
+                if neighbor.value in on_path:
+                    continue
+                new_distance = distance + weight
+                new_bound = new_distance + heuristic(neighbor, target)
+                if new_bound > bound:
+                    next_bound = min(next_bound, new_bound)
+                    continue
+                best_distance = best_distances.get(neighbor.value)
+                if best_distance is not None and best_distance <= new_distance:
+                    continue
+                if best_distance is not None or len(best_distances) < self.max_nodes:
+                    best_distances[neighbor.value] = new_distance
+
+                self.number_of_steps += 1
+                if neighbor.value == target.value:
+                    path.append(neighbor)
+                    return [node.value for node in path], new_distance, next_bound
+                path.append(neighbor)
+                distances.append(new_distance)
+                on_path.add(neighbor.value)
+                stack.append(iter(neighbor.neighbors))
+                break
+            else:
+                # every neighbor was searched, go back to the parent
+                stack.pop()
+                distances.pop()
+                on_path.discard(path.pop().value)
+        return None, None, next_bound
+
+
+    def search(self):
+        """
+            Return the shortest path from the start node to the target node and its cost, like
+            AStar.search. With an admissible heuristic the path is optimal. A NoPath is returned
+            if the target node can not be reached, at once when the graph knows the two nodes are
+            in different components
+            ...
+            Return
+            ------
+                list, int
+        """
+        if self.start is None or self.target is None:
+            print("Error: One or more nodes were not found")
+            return None
+        self.number_of_iterations = 0
+        self.number_of_steps = 0
+        if self.start.value == self.target.value:
+            return [self.start.value], 0
+        if not self.graph.same_component(self.start.value, self.target.value):
+            return NoPath(self.start.value, self.target.value, NoPath.DIFFERENT_COMPONENTS)
+
+        bound = self.heuristic(self.start, self.target)
+        while bound != inf:
+            self.number_of_iterations += 1
+            path, cost, bound = self.depth_first(bound)
+            if path is not None:
+                self.best_distances.clear()
+                return path, cost
+        self.best_distances.clear()
+        return NoPath(self.start.value, self.target.value, NoPath.EXHAUSTED, self.number_of_steps)
@@ -0,0 +1,194 @@
+from array import array
+from math import inf
+
+from graph import Graph
+from dijkstra import shortest_paths
+
+# First bytes of a file written by LandmarkTable.save
+MAGIC = b"ALT1"
+
+
+class LandmarkTable:
+    """
+        This class used to represent the precomputed distances of the ALT heuristic (A*, landmarks
+        and triangle inequality). For a landmark L, |d(L, target) - d(L, node)| is never bigger than
+        the distance between node and target, so the biggest of those values over all the landmarks
+        is an admissible and consistent heuristic. The edges are expected to be undirected
+        ...
+        Attributes
+        ----------
+        index : dict
+            Maps the value of every node to its id (its position in Graph.nodes)
+        landmarks : array
+            The ids of the landmark nodes
+        distances : array
+            The distance from every landmark to every node. The distance from the landmark k to
+            the node i is distances[k * number_of_nodes + i]
+        number_of_nodes : int
+            The number of nodes of the graph
+        ...
+        Methods
+        -------
+        build(graph, number_of_landmarks=8) -> LandmarkTable
+            Choose the landmarks and calculate their distances to every node
+        load(path, graph) -> LandmarkTable
+            Read a table written by save for the given graph
+        save(self, path) -> None
+            Write the table in a binary file
+        distance_bound(self, node_id, target_id) -> float
+            Return the lower bound of the distance between two nodes given by their ids
+        lower_bound(self, node1, node2) -> float
+            Return the lower bound of the distance between two nodes. Can be used as AStar heuristic
+    """
+    def __init__(self, index, landmarks, distances, number_of_nodes):
+        self.index = index
+        self.landmarks = landmarks
+        self.distances = distances
+        self.number_of_nodes = number_of_nodes
+
+
+    @classmethod
+    def build(cls, graph, number_of_landmarks=8):
+        """
+            Choose the landmarks and calculate the distance from them to every node.
+            The first landmark is the node farthest from the first node of the graph and every
+            next landmark is the node farthest from the landmarks already chosen
+            Parameters
+            ----------
+                graph: Graph or FrozenGraph
+                    The graph of the problem
+                number_of_landmarks: int
+                    The number of landmarks (K). Default value is 8
+            ...
+            Return
+            ------
+                LandmarkTable
+        """
+        if isinstance(graph, Graph):
+            graph = graph.freeze()
+        number_of_nodes = graph.number_of_nodes()
+        number_of_landmarks = min(number_of_landmarks, number_of_nodes)
+        landmarks = array('q')
+        distances = array('d')
+        if number_of_landmarks == 0:
+            return cls(graph.index, landmarks, distances, number_of_nodes)
+
+        def farthest(distances):
+            # the nodes of other components are never reached, they are taken before anything else
+            return max(range(number_of_nodes), key=lambda node_id: (distances[node_id] == inf, distances[node_id]))
+
+        candidate = farthest(shortest_paths(graph, 0)[0])
+        # distance from every node to the closest landmark chosen so far
+        closest = None
+        while len(landmarks) < number_of_landmarks:
+            landmarks.append(candidate)
+            landmark_distances = shortest_paths(graph, candidate)[0]
+            distances.extend(landmark_distances)
+            if closest is None:
+                closest = landmark_distances
+            else:
+                for node_id in range(number_of_nodes):
+                    if landmark_distances[node_id] < closest[node_id]:
+                        closest[node_id] = landmark_distances[node_id]
+            candidate = farthest(closest)
+            if closest[candidate] == 0:
+                # every node is as close as possible to a landmark
+                break
+        return cls(graph.index, landmarks, distances, number_of_nodes)
+
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+            Read a table written by save. The graph must have the same nodes, in the same order,
+            as the graph used to build the table
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+                graph: Graph or FrozenGraph
+                    The graph the table belongs to
+            ...
+            Return
+            ------
+                LandmarkTable
+        """
+        if isinstance(graph, Graph):
+            index = {node.value: i for i, node in enumerate(graph.nodes)}
+        else:
+            index = graph.index
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a landmark table")
+            sizes = array('q')
+            sizes.fromfile(file, 2)
+            number_of_landmarks, number_of_nodes = sizes
+            if index is not None and number_of_nodes != len(index):
+                raise ValueError(f"The table has {number_of_nodes} nodes but the graph has {len(index)}")
+            landmarks = array('q')
+            landmarks.fromfile(file, number_of_landmarks)
+            distances = array('d')
+            distances.fromfile(file, number_of_landmarks * number_of_nodes)
+        return cls(index, landmarks, distances, number_of_nodes)
+
+
+    def save(self, path):
+        """
+            Write the table in a binary file, with the native byte order
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+        """
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            array('q', [len(self.landmarks), self.number_of_nodes]).tofile(file)
+            self.landmarks.tofile(file)
+            self.distances.tofile(file)
+
+
+    def distance_bound(self, node_id, target_id):
+        """
+            Return the biggest lower bound of the distance between the two nodes given by the landmarks
+            Parameters
+            ----------
+                node_id: int
+                    The id of the first node
+                target_id: int
+                    The id of the second node
+            ...
+            Return
+            ------
+                float
+        """
+        distances = self.distances
+        number_of_nodes = self.number_of_nodes
+        bound = 0
+        for landmark in range(len(self.landmarks)):
+            offset = landmark * number_of_nodes
+            distance1 = distances[offset + node_id]
+            distance2 = distances[offset + target_id]
+            # a landmark that does not reach both nodes says nothing about them
+            if distance1 != inf and distance2 != inf:
+                difference = abs(distance1 - distance2)
+                if difference > bound:
+                    bound = difference
+        return bound
+
+
+    def lower_bound(self, node1, node2):
+        """
+            Return the lower bound of the distance between the two given nodes. It has the same
+            parameters as AStar.manhattan_distance, so it can be given to AStar as heuristic
+            Parameters
+            ----------
+                node1: Node
+                    Represent the first node
+                node2: Node
+                    Represent the second node
+            ...
+            Return
+            ------
+                float
+        """
+        return self.distance_bound(self.index[node1.value], self.index[node2.value])
@@ -0,0 +1,270 @@
+from collections import deque
+from math import inf
+import heapq
+
+from a_star import NoPath
+
+# the distance of a node without path. The distances are (distance, number of edges) pairs, so an
+# edge of weight 0 still makes a path longer and two nodes joined by it can not keep each other's
+# outdated distance after an edge gets heavier (LPA* needs every edge to cost more than nothing)
+UNREACHED = (inf, 0)
+
+
+class LPAStar:
+    """
+        This class used to represent the Lifelong Planning A* algorithm (LPA*). It keeps its search
+        values between calls to search. When the weight of an edge changes (Graph.update_edge or
+        Graph.add_edge) only the two nodes of that edge are marked as inconsistent, and the next
+        search repairs the part of the shortest path tree that depends on them instead of
+        searching again from the start. The manhattan distance must stay a consistent estimate
+        after every change: no edge may weigh less than the manhattan distance between its nodes.
+        Otherwise the search can stop with a wrong cost, and it raises a ValueError when the
+        distances do not even lead back to the start
+        ...
+        Attributes
+        ----------
+        graph : Graph
+            Represent the graph (search space of the problem)
+        start : Node
+            Represent the starting point
+        target : Node
+            Represent the destination (target) node
+        distance_from_start : dict
+            Maps the value of every reached node to its (distance, number of edges) from the start (g)
+        lookahead : dict
+            Maps the value of every reached node to the best (distance, number of edges) offered by
+            its neighbors (rhs)
+        opened : list
+            Binary heap with (key, value, node) entries for the inconsistent nodes
+        opened_keys : dict
+            Maps the value of every node waiting in the opened list to its current key
+        number_of_steps : int
+            Keep the number of nodes extended by the last call to search
+        ...
+        Methods
+        -------
+        manhattan_distance(self, node1, node2) -> int
+            Calculate the manhattan distance between the two given nodes
+        calculate_key(self, node) -> tuple
+            Calculate the priority of a node in the opened list
+        push(self, node) -> None
+            Insert the node in the opened list with its current key
+        top_key(self) -> tuple
+            Return the smallest key of the opened list
+        update_node(self, node) -> None
+            Recalculate the lookahead value of a node and put it in the opened list if it is inconsistent
+        edge_changed(self, node1, node2) -> None
+            Observer of the graph, called when the weight of an edge changes
+        calculate_path(self) -> list
+            Calculate and return the path from the start node to target node
+        search(self) -> list, int
+            Repair the shortest path tree and return the path to the target node
+        close(self) -> None
+            Stop observing the graph
+    """
+    def __init__(self, graph, start_position, target):
+        self.graph = graph
+        self.start = graph.find_node(start_position)
+        self.target = graph.find_node(target)
+        self.distance_from_start = {}
+        self.lookahead = {self.start.value: (0, 0)}
+        self.opened = []
+        self.opened_keys = {}
+        self.number_of_steps = 0
+        self.push(self.start)
+        graph.add_observer(self.edge_changed)
+
+
+    def manhattan_distance(self, node1, node2):
+        """
+            Calculate and return the manhattan_distance between the two given nodes
+            Parameters
+            ----------
+                node1 : Node
+                    Represent the first node
+                node2 : Node
+                    Represent the second node
+            ...
+            Return
+            ------
+                int
+        """
+        return abs(node1.x - node2.x) + abs(node1.y - node2.y)
+
+
+    def calculate_key(self, node):
+        """
+            Calculate the key of a node: the smallest of its distance and lookahead value plus the
+            manhattan distance to the target, and then the smallest of both values alone, each one
+            followed by its number of edges
+            Parameters
+            ----------
+                node : Node
+                    Represent the node
+            ...
+            Return
+            ------
+                tuple
+        """
+        distance, edges = min(self.distance_from_start.get(node.value, UNREACHED),
+                              self.lookahead.get(node.value, UNREACHED))
+        return (distance + self.manhattan_distance(node, self.target), edges, distance, edges)
+
+
+    def push(self, node):
+        """
+            Insert the node in the opened list with its current key. Older entries of the node
+            are left in the heap and skipped when they are popped
+            Parameters
+            ----------
+                node : Node
+                    Represent the node
+        """
+        key = self.calculate_key(node)
+        self.opened_keys[node.value] = key
+        heapq.heappush(self.opened, (key, node.value, node))
+
+
+    def top_key(self):
+        """
+            Return the key of the first valid entry of the opened list, removing the outdated ones
+            ...
+            Return
+            ------
+                tuple
+        """
+        opened = self.opened
+        while opened and self.opened_keys.get(opened[0][1]) != opened[0][0]:
+            heapq.heappop(opened)
+        if not opened:
+            return (inf, inf, inf, inf)
+        return opened[0][0]
+
+
+    def update_node(self, node):
+        """
+            Recalculate the lookahead value of the node, the best distance offered by its neighbors,
+            and keep the node in the opened list only if it differs from its distance
+            Parameters
+            ----------
+                node : Node
+                    Represent the node
+        """
+        if node.value != self.start.value:
+            lookahead = UNREACHED
+            for neighbor, weight in node.neighbors:
+                distance, edges = self.distance_from_start.get(neighbor.value, UNREACHED)
+                # a distance of inf is never smaller than UNREACHED, which has no edges
+                if (distance + weight, edges + 1) < lookahead:
+                    lookahead = (distance + weight, edges + 1)
+            self.lookahead[node.value] = lookahead
+        self.opened_keys.pop(node.value, None)
+        if self.distance_from_start.get(node.value, UNREACHED) != self.lookahead.get(node.value, UNREACHED):
+            self.push(node)
+
+
+    def edge_changed(self, node1, node2):
+        """
+            Observer of the graph. Mark the two nodes of the changed edge as possibly inconsistent
+            Parameters
+            ----------
+                node1 : Node
+                    The first node of the edge
+                node2 : Node
+                    The second node of the edge
+        """
+        self.update_node(node1)
+        self.update_node(node2)
+
+
+    def calculate_path(self):
+        """
+            Calculate and return the path (solution) of the problem, going back from the target node
+            through the neighbors that give its distance. It is a breadth-first search over those
+            neighbors that never visits a node twice, so it ends even if the distances are outdated.
+            A ValueError is raised if they do not lead to the start node, which happens when an edge
+            weighs less than the manhattan distance between its nodes
+            ...
+            Return
+            ------
+                list
+        """
+        distance_from_start = self.distance_from_start
+        # the node closer to the target from which every reached node was found
+        following = {self.target.value: None}
+        pending = deque([self.target])
+        while pending:
+            node = pending.popleft()
+            if node.value == self.start.value:
+                break
+            distance, edges = distance_from_start[node.value]
+            for neighbor, weight in node.neighbors:
+                if neighbor.value in following:
+                    continue
+                neighbor_distance, neighbor_edges = distance_from_start.get(neighbor.value, UNREACHED)
+                if neighbor_distance + weight == distance and neighbor_edges + 1 == edges:
+                    following[neighbor.value] = node
+                    pending.append(neighbor)
+
+        if self.start.value not in following:
+            raise ValueError(f"The distances do not lead from {self.target.value} back to "
+                             f"{self.start.value}; every edge must weigh at least the manhattan "
+                             f"distance between its nodes")
+        path = [self.start.value]
+        node = following[self.start.value]
+        while node is not None:
+            path.append(node.value)
+            node = following[node.value]
+        return path
+
+
+    def search(self):
+        """
+            Extend the inconsistent nodes until the target node is consistent and no node of the
+            opened list can offer a better path. The first call is a normal A* search; the next ones
+            only extend the nodes affected by the edges changed in between
+            ...
+            Return
+            ------
+                list, int
+                    The path and its cost, or a NoPath if the target can not be reached. A
+                    ValueError is raised if the path can not be rebuilt from the distances,
+                    because an edge weighs less than the manhattan distance between its nodes
+        """
+        self.number_of_steps = 0
+        distance_from_start = self.distance_from_start
+        target = self.target
+        while (self.top_key() < self.calculate_key(target)
+               or self.lookahead.get(target.value, UNREACHED) != distance_from_start.get(target.value, UNREACHED)):
+            if not self.opened:
+                break
+            self.number_of_steps += 1
+            _, _, node = heapq.heappop(self.opened)
+            del self.opened_keys[node.value]
+
+            lookahead = self.lookahead.get(node.value, UNREACHED)
+            if distance_from_start.get(node.value, UNREACHED) > lookahead:
+                # the node got a better path
+                distance_from_start[node.value] = lookahead
+                for neighbor, _ in node.neighbors:
+                    self.update_node(neighbor)
+            else:
+                # the path of the node got worse, so everything that depends on it is checked again
+                distance_from_start[node.value] = UNREACHED
+                self.update_node(node)
+                for neighbor, _ in node.neighbors:
+                    self.update_node(neighbor)
+
+        total_cost = distance_from_start.get(target.value, UNREACHED)[0]
+        if total_cost == inf:
+            return NoPath(self.start.value, target.value, NoPath.EXHAUSTED, self.number_of_steps)
+        return self.calculate_path(), total_cost
+
+
+    def close(self):
+        """
+            Stop observing the graph, so its changes are not sent to this planner any more. The
+            planner can not search after it. The graph only keeps a weak reference to the planner,
+            so a planner that is not used any more stops observing it without close too
+        """
+        self.graph.remove_observer(self.edge_changed)
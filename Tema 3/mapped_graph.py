@@ -0,0 +1,298 @@
+from array import array
+import mmap
+
+from graph import Graph, FrozenGraph
+
+MAGIC = b"GRAPHMAP"
+FORMAT_VERSION = 2
+# written as an int64, it reads back differently on a machine with another byte order
+BYTE_ORDER_MARK = 0x0102030405060708
+
+# the arrays of the file, in this order, with their typecodes (weights are 'q' or 'd')
+SECTIONS = (
+    ("offsets", 'q'),
+    ("targets", 'q'),
+    ("weights", None),
+    ("x", 'd'),
+    ("y", 'd'),
+    ("ranks", 'q'),
+    ("components", 'q'),
+    ("order", 'q'),
+    ("value_offsets", 'q'),
+    ("value_bytes", 'B'),
+)
+HEADER_FIELDS = 6
+
+
+class MappedValues:
+    """
+        This class used to represent the values of the nodes of a MappedGraph without creating a
+        string per node when the file is opened. A value is decoded from the UTF-8 bytes of the
+        file every time it is read
+        ...
+        Attributes
+        ----------
+        value_offsets : memoryview
+            The value of the node i is stored between value_offsets[i] and value_offsets[i+1]
+        value_bytes : memoryview
+            The UTF-8 bytes of all the values
+        ...
+        Methods
+        -------
+        __len__(self) -> int
+            Return the number of values
+        __getitem__(self, node_id) -> str
+            Return the value of the node with the given id
+    """
+    def __init__(self, value_offsets, value_bytes):
+        self.value_offsets = value_offsets
+        self.value_bytes = value_bytes
+
+
+    def __len__(self):
+        return len(self.value_offsets) - 1
+
+
+    def __getitem__(self, node_id):
+        if isinstance(node_id, slice):
+            return [self[i] for i in range(*node_id.indices(len(self)))]
+        if node_id < 0:
+            node_id += len(self)
+        if not 0 <= node_id < len(self):
+            raise IndexError("node id out of range")
+        return str(self.value_bytes[self.value_offsets[node_id]:self.value_offsets[node_id + 1]], "utf-8")
+
+
+    def __iter__(self):
+        for node_id in range(len(self)):
+            yield self[node_id]
+
+
+class MappedGraph(FrozenGraph):
+    """
+        This class used to represent a FrozenGraph whose arrays are views of a memory-mapped file
+        written by save_mapped. Opening the file only reads its header, so it takes the same time
+        for any size of graph, and the processes that open the same file share the pages of the
+        file instead of holding a copy each. The search algorithms of FrozenGraph use it as it is
+        ...
+        The file is the magic b"GRAPHMAP", then 6 int64 (a byte order mark, the version of the
+        format, the number of nodes, the number of edges, 1 if the weights are floats and 1 if the
+        nodes have values), then an (offset, length) int64 pair per array of SECTIONS, and the
+        arrays, each one starting at a multiple of 8 bytes
+        ...
+        Attributes
+        ----------
+        memory : mmap
+            The mapped file
+        order : memoryview
+            The ids of the nodes sorted by their values, used to find a value with a binary search
+        views : list
+            Every view of the mapped file, released by close
+        ...
+        Methods
+        -------
+        load(path) -> MappedGraph
+            Map a file written by save_mapped
+        find_id(self, value) -> int
+            Return the id of the node with the given value with a binary search
+        index(self) -> dict
+            Maps the value of every node to its id, built the first time it is used
+        close(self) -> None
+            Release the views and close the mapped file
+    """
+    def __init__(self, memory, arrays, has_values, views):
+        self.memory = memory
+        self.views = views
+        self.version = 0
+        self.offsets = arrays["offsets"]
+        self.targets = arrays["targets"]
+        self.weights = arrays["weights"]
+        self.x = arrays["x"]
+        self.y = arrays["y"]
+        self.ranks = arrays["ranks"]
+        self.components = arrays["components"]
+        self.order = arrays["order"]
+        if has_values:
+            self.values = MappedValues(arrays["value_offsets"], arrays["value_bytes"])
+        else:
+            self.values = range(len(self.offsets) - 1)
+        self._index = None
+
+
+    @property
+    def index(self):
+        """
+            Maps the value of every node to its id, like FrozenGraph.index. It is None when the
+            nodes are named by their ids. The dictionary is built the first time it is used, so
+            opening the file stays fast
+        """
+        if isinstance(self.values, range):
+            return None
+        if self._index is None:
+            self._index = {value: i for i, value in enumerate(self.values)}
+        return self._index
+
+
+    @classmethod
+    def load(cls, path):
+        """
+            Map a file written by save_mapped. Only the header is read; the arrays are views of
+            the mapped file
+            Parameters
+            ----------
+                path: str
+                    The path of the file
+            ...
+            Return
+            ------
+                MappedGraph
+        """
+        with open(path, "rb") as file:
+            try:
+                memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty")
+        buffer = memoryview(memory)
+        header_size = len(MAGIC) + 8 * (HEADER_FIELDS + 2 * len(SECTIONS))
+        if len(buffer) < header_size or buffer[:len(MAGIC)] != MAGIC:
+            buffer.release()
+            memory.close()
+            raise ValueError(f"{path} is not a mapped graph")
+        header = array('q')
+        header.frombytes(buffer[len(MAGIC):header_size])
+        byte_order_mark, version, number_of_nodes, number_of_edges, float_weights, has_values = header[:HEADER_FIELDS]
+        problem = None
+        if byte_order_mark != BYTE_ORDER_MARK:
+            problem = f"{path} was written on a machine with another byte order"
+        elif version != FORMAT_VERSION:
+            problem = f"{path} has version {version} of the format, only version {FORMAT_VERSION} can be read"
+
+        arrays = {}
+        views = []
+        for i, (name, typecode) in enumerate(SECTIONS):
+            if problem is not None:
+                break
+            if typecode is None:
+                typecode = 'd' if float_weights else 'q'
+            offset, length = header[HEADER_FIELDS + 2 * i], header[HEADER_FIELDS + 2 * i + 1]
+            end = offset + length * array(typecode).itemsize
+            if offset < header_size or end > len(buffer):
+                problem = f"{path} is shorter than its header says"
+                break
+            section = buffer[offset:end]
+            arrays[name] = section.cast(typecode)
+            views.extend((section, arrays[name]))
+        if problem is None and (len(arrays["offsets"]) != number_of_nodes + 1 or len(arrays["targets"]) != number_of_edges):
+            problem = f"{path} has arrays of the wrong size"
+        if problem is not None:
+            for view in reversed(views):
+                view.release()
+            buffer.release()
+            memory.close()
+            raise ValueError(problem)
+        views.append(buffer)
+        return cls(memory, arrays, has_values, views)
+
+
+    def find_id(self, value):
+        """
+            Return the id of the node with the given value, or None if the value is not in the
+            graph. The ids sorted by value are searched with a binary search, so no dictionary of
+            every value is needed
+            Parameters
+            ----------
+                value: str
+                    Is the value of the node we want to find
+            ...
+            Return
+            ------
+                int
+        """
+        if isinstance(self.values, range):
+            if isinstance(value, int) and 0 <= value < len(self.values):
+                return value
+            return None
+        if not isinstance(value, str):
+            return None
+        values, order = self.values, self.order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if values[order[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and values[order[low]] == value:
+            return order[low]
+        return None
+
+
+    def close(self):
+        """
+            Release the views of the mapped file and close it. The graph can not be used after it,
+            and views kept outside the graph must be released first
+        """
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.memory.close()
+
+
+def save_mapped(graph, path):
+    """
+        Write the graph in the format read by MappedGraph.load. The values of the nodes must be
+        strings, or the graph must be a FrozenGraph with nodes named by their ids
+        Parameters
+        ----------
+            graph: Graph or FrozenGraph
+                The graph to write
+            path: str
+                The path of the file
+    """
+    if isinstance(graph, Graph):
+        graph = graph.freeze()
+    number_of_nodes = graph.number_of_nodes()
+    has_values = not isinstance(graph.values, range)
+    value_offsets = array('q', [0])
+    value_bytes = bytearray()
+    if has_values:
+        for value in graph.values:
+            if not isinstance(value, str):
+                raise ValueError(f"Only string values can be written, not {value!r}")
+            value_bytes += value.encode("utf-8")
+            value_offsets.append(len(value_bytes))
+    # the ids sorted by value are the inverse of the ranks
+    order = array('q', bytes(8 * number_of_nodes))
+    for node_id, rank in enumerate(graph.ranks):
+        order[rank] = node_id
+
+    float_weights = memoryview(graph.weights).format == 'd'
+    sections = {
+        "offsets": graph.offsets,
+        "targets": graph.targets,
+        "weights": graph.weights,
+        "x": graph.x,
+        "y": graph.y,
+        "ranks": graph.ranks,
+        "components": graph.components,
+        "order": order,
+        "value_offsets": value_offsets,
+        "value_bytes": value_bytes,
+    }
+    header_size = len(MAGIC) + 8 * (HEADER_FIELDS + 2 * len(SECTIONS))
+    table = array('q')
+    position = header_size
+    for name, _ in SECTIONS:
+        data = memoryview(sections[name])
+        table.extend((position, len(data)))
+        position += (data.nbytes + 7) // 8 * 8
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        array('q', [BYTE_ORDER_MARK, FORMAT_VERSION, number_of_nodes, graph.number_of_edges(),
+                    float_weights, has_values]).tofile(file)
+        table.tofile(file)
+        for name, _ in SECTIONS:
+            data = memoryview(sections[name]).cast("B")
+            file.write(data)
+            file.write(bytes(-len(data) % 8))
@@ -0,0 +1,227 @@
+from collections import OrderedDict
+
+from a_star import AStar, NoPath
+
+
+def a_star_search(graph, start_position, target):
+    """
+        Default search of RouteCache: a new AStar search on the graph
+        ...
+        Return
+        ------
+            list, int
+                The path and its cost, or a NoPath
+    """
+    return AStar(graph, start_position, target).search()
+
+
+class RouteCache:
+    """
+        This class used to keep the answers of the most frequent (start, target) queries in front of
+        a search algorithm. The cache has a maximum number of routes and removes either the least
+        recently used (LRU) or the least frequently used (LFU) route when it is full. Every route
+        belongs to a version of the graph: when the version changes the whole cache is emptied, so
+        an old route is never returned
+        ...
+        Attributes
+        ----------
+        graph : Graph
+            Represent the graph (search space of the problem)
+        max_routes : int
+            The number of routes the cache can keep
+        policy : str
+            "lru" or "lfu"
+        symmetric : Boolean
+            If True, the route from target to start is used for the route from start to target.
+            Only valid for undirected graphs, like the ones built with Graph.add_edge
+        search_function : function
+            Called with (graph, start, target) on a miss. The default runs AStar
+        routes : OrderedDict
+            The cached (path, cost) by (start, target), or the NoPath of the queries without
+            solution
+        frequencies : dict
+            The number of uses of every route (LFU)
+        buckets : dict
+            The routes of every frequency, from the oldest to the newest (LFU)
+        version : int
+            The version of the graph the cached routes belong to
+        hits : int
+            The number of queries answered by the cache
+        misses : int
+            The number of queries that needed a search
+        evictions : int
+            The number of routes removed to make room for new ones
+        invalidations : int
+            The number of times the cache was emptied because the graph changed
+        ...
+        Methods
+        -------
+        search(self, start_position, target) -> list, int
+            Return the route between the two given nodes, from the cache when possible
+        lookup(self, key) -> tuple
+            Return the cached route of a key and mark it as used
+        store(self, key, route) -> None
+            Add a route to the cache, removing another one if it is full
+        evict(self) -> None
+            Remove the route chosen by the policy
+        clear(self) -> None
+            Remove every route
+        statistics(self) -> dict
+            Return the counters of the cache
+    """
+    def __init__(self, graph, max_routes=1024, policy="lru", symmetric=True, search_function=None):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown policy {policy}, use 'lru' or 'lfu'")
+        self.graph = graph
+        self.max_routes = max_routes
+        self.policy = policy
+        self.symmetric = symmetric
+        if search_function is None:
+            search_function = a_star_search
+        self.search_function = search_function
+        self.routes = OrderedDict()
+        self.frequencies = {}
+        self.buckets = {}
+        self.version = graph.version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+    def clear(self):
+        """
+            Remove every route of the cache
+        """
+        self.routes.clear()
+        self.frequencies.clear()
+        self.buckets.clear()
+
+
+    def lookup(self, key):
+        """
+            Return the cached route of the key, or a tuple with False if it is not cached.
+            The route is marked as used
+            Parameters
+            ----------
+                key: tuple
+                    The (start, target) values
+            ...
+            Return
+            ------
+                tuple
+                    (True, route) or (False, None)
+        """
+        if key not in self.routes:
+            return False, None
+        if self.policy == "lru":
+            self.routes.move_to_end(key)
+        else:
+            frequency = self.frequencies[key]
+            del self.buckets[frequency][key]
+            if not self.buckets[frequency]:
+                del self.buckets[frequency]
+            self.frequencies[key] = frequency + 1
+            self.buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+        return True, self.routes[key]
+
+
+    def evict(self):
+        """
+            Remove the least recently used route (LRU), or the oldest of the least frequently used
+            routes (LFU)
+        """
+        if self.policy == "lru":
+            self.routes.popitem(last=False)
+        else:
+            frequency = min(self.buckets)
+            key, _ = self.buckets[frequency].popitem(last=False)
+            if not self.buckets[frequency]:
+                del self.buckets[frequency]
+            del self.frequencies[key]
+            del self.routes[key]
+        self.evictions += 1
+
+
+    def store(self, key, route):
+        """
+            Add the route to the cache, removing another route if the cache is full
+            Parameters
+            ----------
+                key: tuple
+                    The (start, target) values
+                route: tuple
+                    The (path, cost) of the query, or its NoPath if it has no solution
+        """
+        if self.max_routes <= 0:
+            return
+        if len(self.routes) >= self.max_routes:
+            self.evict()
+        self.routes[key] = route
+        if self.policy == "lfu":
+            self.frequencies[key] = 1
+            self.buckets.setdefault(1, OrderedDict())[key] = None
+
+
+    def search(self, start_position, target):
+        """
+            Return the route between the two given nodes like AStar.search. The path is a new list,
+            so the caller can change it without changing the cache. A query without solution gives
+            the NoPath of the search, with the start and the target of the query
+            Parameters
+            ----------
+                start_position: str
+                    The value of the starting node
+                target: str
+                    The value of the destination node
+            ...
+            Return
+            ------
+                list, int
+                    The path and its cost, or a NoPath
+        """
+        if self.version != self.graph.version:
+            self.clear()
+            self.version = self.graph.version
+            self.invalidations += 1
+
+        found, route = self.lookup((start_position, target))
+        reverse = False
+        if not found and self.symmetric:
+            found, route = self.lookup((target, start_position))
+            reverse = True
+        if found:
+            self.hits += 1
+            if not route:
+                if reverse and isinstance(route, NoPath):
+                    return NoPath(start_position, target, route.reason, route.number_of_steps)
+                return route
+            path, cost = route
+            return (list(reversed(path)) if reverse else list(path)), cost
+
+        self.misses += 1
+        route = self.search_function(self.graph, start_position, target)
+        if route:
+            path, cost = route
+            route = (tuple(path), cost)
+        self.store((start_position, target), route)
+        if not route:
+            return route
+        return list(route[0]), route[1]
+
+
+    def statistics(self):
+        """
+            Return the counters of the cache
+            ...
+            Return
+            ------
+                dict
+        """
+        return {
+            "routes": len(self.routes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,83 @@
+class SearchStats:
+    """
+        This class used to represent the measurements of one search. The counters are calculated
+        from the lists of the search when it ends, so the search loop only has to keep the few
+        values that can not be found later
+        ...
+        Attributes
+        ----------
+        found : Boolean
+            True if a path was found
+        expansions : int
+            The number of extended nodes
+        pushes : int
+            The number of entries pushed to the opened list
+        reopenings : int
+            The number of times a closed node was reached with a shorter distance. It is 0 when
+            the heuristic is consistent
+        stale_pops : int
+            The number of outdated entries popped from the opened list (left behind when a node
+            got a better heuristic value and was pushed again)
+        peak_open_size : int
+            The biggest size of the opened list, outdated entries included
+        closed_size : int
+            The number of closed nodes when the search ended
+        setup_time : float
+            Seconds spent before the first expansion
+        search_time : float
+            Seconds spent extending nodes
+        reconstruction_time : float
+            Seconds spent building the path and its cost
+        ...
+        Methods
+        -------
+        total_time(self) -> float
+            Return the seconds spent by the whole search
+        as_dict(self) -> dict
+            Return the measurements as a dictionary
+        __str__(self) -> str
+            Return one "name: value" line per measurement
+    """
+    def __init__(self):
+        self.found = False
+        self.expansions = 0
+        self.pushes = 0
+        self.reopenings = 0
+        self.stale_pops = 0
+        self.peak_open_size = 0
+        self.closed_size = 0
+        self.setup_time = 0.0
+        self.search_time = 0.0
+        self.reconstruction_time = 0.0
+
+
+    def total_time(self):
+        """
+            Return the seconds spent by the whole search
+            ...
+            Return
+            ------
+                float
+        """
+        return self.setup_time + self.search_time + self.reconstruction_time
+
+
+    def as_dict(self):
+        """
+            Return the measurements as a dictionary, for logging or printing
+            ...
+            Return
+            ------
+                dict
+        """
+        return dict(vars(self), total_time=self.total_time())
+
+
+    def __str__(self):
+        """
+            Define that the measurements are printed one "name: value" per line
+            Returns
+            -------
+                str
+        """
+        return "\n".join(f"{name}: {value}" for name, value in self.as_dict().items())
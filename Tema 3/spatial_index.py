@@ -0,0 +1,404 @@
+from math import floor, hypot, inf, sqrt
+import heapq
+
+
+class SpatialIndex:
+    """
+        This class used to find the nodes of a graph closest to a position (x, y) without looking at
+        every node. The plane is divided in square cells and every cell keeps its nodes (a uniform
+        grid). A query only looks at the cells around the position, ring after ring, until no node of
+        a farther ring can be closer. The nodes added to the graph after the index was built are
+        indexed before every query, since Graph.nodes only grows. When the cell size was not given,
+        the grid is built again with a new cell size once the graph has REGRID_FACTOR times more
+        nodes or its bounds REGRID_FACTOR times more cells than when the cell size was chosen
+        ...
+        Attributes
+        ----------
+        graph : Graph
+            Represent the graph whose nodes are indexed
+        cell_size : float
+            The side of a cell. By default it is chosen so a cell has about two nodes
+        automatic_cell_size : Boolean
+            True if the cell size is chosen by the index and changed when the graph grows
+        grid_nodes : int
+            The number of nodes when the cell size was chosen
+        grid_cells : int
+            The number of cells in the bounds when the cell size was chosen
+        cells : dict
+            Maps the (column, row) of every cell with nodes to the list of its nodes
+        number_of_indexed : int
+            The number of nodes of graph.nodes already in the cells
+        bounds : list
+            The smallest and the biggest column and row of the cells with nodes
+        ...
+        Methods
+        -------
+        refresh(self) -> None
+            Index the nodes added to the graph since the last query
+        number_of_cells(self) -> int
+            Return the number of cells in the bounds
+        outgrown(self) -> Boolean
+            Tell if the cell size no longer fits the indexed nodes
+        regrid(self) -> None
+            Choose the cell size again and index all the nodes
+        add(self, node) -> None
+            Put a node in its cell
+        cell_of(self, x, y) -> tuple
+            Return the (column, row) of the cell of a position
+        ring(self, column, row, radius) -> generator
+            Give the cells with nodes at the given distance in cells from a cell
+        distance_outside(self, x, y, column, row, radius) -> float
+            Return the distance from the position to the cells not visited yet
+        nearest(self, x, y, k=1) -> list
+            Return the k nodes closest to the position
+        within(self, x, y, radius) -> list
+            Return the nodes at most radius away from the position
+        snap(self, x, y) -> Node
+            Return the node closest to the position
+        snap_many(self, points) -> list
+            Return the node closest to every position
+    """
+    REGRID_FACTOR = 4
+
+    def __init__(self, graph, cell_size=None):
+        self.graph = graph
+        self.automatic_cell_size = cell_size is None
+        self.cell_size = cell_size
+        self.cells = {}
+        self.number_of_indexed = 0
+        self.bounds = [inf, -inf, inf, -inf]
+        self.grid_nodes = 0
+        self.grid_cells = 0
+        if cell_size is None:
+            self.regrid()
+        else:
+            self.refresh()
+
+
+    @staticmethod
+    def default_cell_size(nodes):
+        """
+            Return a cell size that puts about two nodes in every cell, if the nodes are spread
+            evenly over their bounding box
+            Parameters
+            ----------
+                nodes: list
+                    The nodes of the graph
+            ...
+            Return
+            ------
+                float
+        """
+        if len(nodes) < 2:
+            return 1.0
+        xs = [node.x for node in nodes]
+        ys = [node.y for node in nodes]
+        width = max(xs) - min(xs)
+        height = max(ys) - min(ys)
+        area = width * height if width and height else max(width, height) ** 2
+        if area == 0:
+            return 1.0
+        return sqrt(2 * area / len(nodes))
+
+
+    def cell_of(self, x, y):
+        """
+            Return the (column, row) of the cell that contains the position
+            ...
+            Return
+            ------
+                tuple
+        """
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+
+    def add(self, node):
+        """
+            Put the node in the cell of its coordinates
+            Parameters
+            ----------
+                node: Node
+                    The node to index
+        """
+        column, row = self.cell_of(node.x, node.y)
+        cell = self.cells.get((column, row))
+        if cell is None:
+            self.cells[(column, row)] = [node]
+        else:
+            cell.append(node)
+        bounds = self.bounds
+        if column < bounds[0]:
+            bounds[0] = column
+        if column > bounds[1]:
+            bounds[1] = column
+        if row < bounds[2]:
+            bounds[2] = row
+        if row > bounds[3]:
+            bounds[3] = row
+
+
+    def refresh(self):
+        """
+            Index the nodes added to the graph after the last call, and build the grid again if
+            the cell size chosen by the index no longer fits the nodes
+        """
+        nodes = self.graph.nodes
+        if self.number_of_indexed == len(nodes):
+            return
+        for position in range(self.number_of_indexed, len(nodes)):
+            self.add(nodes[position])
+        self.number_of_indexed = len(nodes)
+        if self.automatic_cell_size and self.outgrown():
+            self.regrid()
+
+
+    def number_of_cells(self):
+        """
+            Return the number of cells in the bounds of the index
+            ...
+            Return
+            ------
+                int
+        """
+        min_column, max_column, min_row, max_row = self.bounds
+        if min_column > max_column:
+            return 0
+        return (max_column - min_column + 1) * (max_row - min_row + 1)
+
+
+    def outgrown(self):
+        """
+            Tell if the graph has REGRID_FACTOR times more nodes, or the bounds REGRID_FACTOR times
+            more cells, than when the cell size was chosen. Then the cells have too many nodes, or
+            the queries go through too many empty cells
+            ...
+            Return
+            ------
+                Boolean
+        """
+        factor = self.REGRID_FACTOR
+        return (self.number_of_indexed >= factor * max(self.grid_nodes, 1)
+                or self.number_of_cells() >= factor * max(self.grid_cells, 1))
+
+
+    def regrid(self):
+        """
+            Choose the cell size for the nodes of the graph and put all of them in the new cells.
+            Since it happens when the nodes or the bounds grew REGRID_FACTOR times, its cost is
+            spread over the nodes added before it
+        """
+        nodes = self.graph.nodes
+        self.cell_size = self.default_cell_size(nodes)
+        self.cells = {}
+        self.bounds = [inf, -inf, inf, -inf]
+        for node in nodes:
+            self.add(node)
+        self.number_of_indexed = len(nodes)
+        self.grid_nodes = len(nodes)
+        self.grid_cells = self.number_of_cells()
+
+
+    def ring(self, column, row, radius):
+        """
+            Give the cells with nodes at the given Chebyshev distance (in cells) from a cell,
+            leaving out the ones outside the bounds of the index
+            Parameters
+            ----------
+                column: int
+                    The column of the center cell
+                row: int
+                    The row of the center cell
+                radius: int
+                    The distance in cells
+            ...
+            Return
+            ------
+                generator
+        """
+        min_column, max_column, min_row, max_row = self.bounds
+        cells = self.cells
+        first_column = max(column - radius, min_column)
+        last_column = min(column + radius, max_column)
+        if radius == 0:
+            rows = (row,)
+        else:
+            rows = (row - radius, row + radius)
+        for ring_row in rows:
+            if min_row <= ring_row <= max_row:
+                for ring_column in range(first_column, last_column + 1):
+                    cell = cells.get((ring_column, ring_row))
+                    if cell is not None:
+                        yield cell
+        if radius == 0:
+            return
+        first_row = max(row - radius + 1, min_row)
+        last_row = min(row + radius - 1, max_row)
+        for ring_column in (column - radius, column + radius):
+            if min_column <= ring_column <= max_column:
+                for ring_row in range(first_row, last_row + 1):
+                    cell = cells.get((ring_column, ring_row))
+                    if cell is not None:
+                        yield cell
+
+
+    def nearest(self, x, y, k=1):
+        """
+            Return the k nodes closest to the position, from the closest one, with their distances.
+            Fewer nodes are returned if the graph has less than k nodes
+            Parameters
+            ----------
+                x: float
+                    The x-coordinate of the position
+                y: float
+                    The y-coordinate of the position
+                k: int
+                    The number of nodes
+            ...
+            Return
+            ------
+                list
+                    (distance, node) tuples
+        """
+        self.refresh()
+        if not self.cells or k <= 0:
+            return []
+        min_column, max_column, min_row, max_row = self.bounds
+        # the rings start from the cell of the bounds closest to the position
+        column, row = self.cell_of(x, y)
+        column = min(max(column, min_column), max_column)
+        row = min(max(row, min_row), max_row)
+        # heap of the k best as (-distance, tie, node), so the farthest of them is on top
+        best = []
+        tie = 0
+        radius = 0
+        while True:
+            for cell in self.ring(column, row, radius):
+                for node in cell:
+                    distance = hypot(node.x - x, node.y - y)
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, tie, node))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, tie, node))
+                    tie += 1
+            closest_left = self.distance_outside(x, y, column, row, radius)
+            if closest_left == inf or (len(best) == k and -best[0][0] <= closest_left):
+                break
+            radius += 1
+        return [(-distance, node) for distance, _, node in sorted(best, reverse=True)]
+
+
+    def distance_outside(self, x, y, column, row, radius):
+        """
+            Return the distance from the position to the closest cell of the bounds that is not in
+            the rings visited so far, or inf if every cell was visited
+            Parameters
+            ----------
+                x: float
+                    The x-coordinate of the position
+                y: float
+                    The y-coordinate of the position
+                column: int
+                    The column of the center of the rings
+                row: int
+                    The row of the center of the rings
+                radius: int
+                    The last visited ring
+            ...
+            Return
+            ------
+                float
+        """
+        min_column, max_column, min_row, max_row = self.bounds
+        first_column, last_column = column - radius, column + radius
+        first_row, last_row = row - radius, row + radius
+        # the cells left are in the strips left, right, under and above the visited square
+        strips = (
+            (min_column, first_column - 1, min_row, max_row),
+            (last_column + 1, max_column, min_row, max_row),
+            (max(first_column, min_column), min(last_column, max_column), min_row, first_row - 1),
+            (max(first_column, min_column), min(last_column, max_column), last_row + 1, max_row),
+        )
+        size = self.cell_size
+        closest = inf
+        for strip_first_column, strip_last_column, strip_first_row, strip_last_row in strips:
+            if strip_first_column > strip_last_column or strip_first_row > strip_last_row:
+                continue
+            dx = max(strip_first_column * size - x, 0, x - (strip_last_column + 1) * size)
+            dy = max(strip_first_row * size - y, 0, y - (strip_last_row + 1) * size)
+            closest = min(closest, hypot(dx, dy))
+        return closest
+
+
+    def within(self, x, y, radius):
+        """
+            Return the nodes at most radius away from the position, from the closest one, with
+            their distances
+            Parameters
+            ----------
+                x: float
+                    The x-coordinate of the position
+                y: float
+                    The y-coordinate of the position
+                radius: float
+                    The biggest distance
+            ...
+            Return
+            ------
+                list
+                    (distance, node) tuples
+        """
+        self.refresh()
+        first_column, first_row = self.cell_of(x - radius, y - radius)
+        last_column, last_row = self.cell_of(x + radius, y + radius)
+        min_column, max_column, min_row, max_row = self.bounds
+        result = []
+        for column in range(max(first_column, min_column), min(last_column, max_column) + 1):
+            for row in range(max(first_row, min_row), min(last_row, max_row) + 1):
+                for node in self.cells.get((column, row), ()):
+                    distance = hypot(node.x - x, node.y - y)
+                    if distance <= radius:
+                        result.append((distance, node))
+        result.sort(key=lambda pair: pair[0])
+        return result
+
+
+    def snap(self, x, y):
+        """
+            Return the node closest to the position, or None if the graph has no nodes. Its value
+            can be given to AStar as the start or the target
+            Parameters
+            ----------
+                x: float
+                    The x-coordinate of the position
+                y: float
+                    The y-coordinate of the position
+            ...
+            Return
+            ------
+                Node
+        """
+        result = self.nearest(x, y, 1)
+        return result[0][1] if result else None
+
+
+    def snap_many(self, points):
+        """
+            Return the node closest to every (x, y) position. The new nodes of the graph are
+            indexed once for all the positions
+            Parameters
+            ----------
+                points: list
+                    (x, y) tuples
+            ...
+            Return
+            ------
+                list
+                    A node (or None) per position
+        """
+        self.refresh()
+        nearest = self.nearest
+        result = []
+        for x, y in points:
+            closest = nearest(x, y, 1)
+            result.append(closest[0][1] if closest else None)
+        return result
@@ -0,0 +1,55 @@
+import pytest
+
+from graph import Node
+from a_star import AStar, NoPath
+from ida_star import IDAStar
+from benchmark import build_grid
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_nodes", [0, 3, 100000])
+def test_cost_matches_a_star(seed, max_nodes):
+    graph = build_grid(6, 5, seed)
+    for target in ("5,4", "0,4", "3,2"):
+        expected = AStar(graph, "0,0", target).search()[1]
+        assert IDAStar(graph, "0,0", target, max_nodes=max_nodes).search()[1] == expected
+
+
+def test_start_is_target():
+    graph = build_grid(3, 3)
+    assert IDAStar(graph, "1,1", "1,1", max_nodes=0).search() == (["1,1"], 0)
+
+
+@pytest.mark.parametrize("max_nodes", [0, 3, 100000])
+def test_path_has_the_returned_cost(max_nodes):
+    graph = build_grid(6, 5, 7)
+    path, cost = IDAStar(graph, "0,0", "5,4", max_nodes=max_nodes).search()
+    assert path[0] == "0,0" and path[-1] == "5,4"
+    total = 0
+    for value, next_value in zip(path, path[1:]):
+        node = graph.find_node(value)
+        total += min(weight for neighbor, weight in node.neighbors if neighbor.value == next_value)
+    assert total == cost
+
+
+@pytest.mark.parametrize("max_nodes", [0, 3, 100000])
+def test_unreachable_target(max_nodes):
+    graph = build_grid(4, 4, 1)
+    graph.add_node(Node("island", (10, 10)))
+    result = IDAStar(graph, "0,0", "island", max_nodes=max_nodes).search()
+    assert isinstance(result, NoPath) and not result
+    assert result.reason == NoPath.DIFFERENT_COMPONENTS
+    assert not AStar(graph, "0,0", "island").search()
+
+
+@pytest.mark.parametrize("max_nodes", [3, 100000])
+def test_target_only_leaves_towards_the_start(max_nodes):
+    # a one-way edge puts the two nodes in the same component, so the search has to run out of nodes
+    graph = build_grid(4, 4, 2)
+    island = Node("island", (10, 10))
+    graph.add_node(island)
+    island.add_neighboor((graph.find_node("3,3"), 1))
+    result = IDAStar(graph, "0,0", "island", max_nodes=max_nodes).search()
+    assert isinstance(result, NoPath) and not result
+    assert result.reason == NoPath.EXHAUSTED
+    assert not AStar(graph, "0,0", "island").search()